@@ -1,9 +1,9 @@
 """Building Detection API Package"""
 
-from .config import get_settings, settings
+from .config import get_settings
 from .dependencies import (
-    get_model, get_executor, get_app_settings, get_job_manager,
-    validate_model_loaded, validate_server_capacity
+    get_model, get_app_settings, get_job_manager,
+    validate_model_loaded
 )
 from .exceptions import register_exception_handlers
 
@@ -11,14 +11,20 @@ __version__ = "2.0.0"
 __title__ = "Building Detection API"
 __description__ = "Modular FastAPI building detection service using YOLOv8"
 
+
+def __getattr__(name: str):
+    """Resolve `api.settings` lazily from the cached settings factory"""
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = [
     "get_settings",
     "settings", 
     "get_model",
-    "get_executor",
     "get_app_settings",
     "get_job_manager",
     "validate_model_loaded",
-    "validate_server_capacity",
     "register_exception_handlers",
 ]
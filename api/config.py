@@ -1,118 +1,143 @@
 """Configuration management for Building Detection API"""
 
 import os
-from typing import List, Optional
-from pydantic import Field
-from pydantic_settings import BaseSettings
+import json
+from functools import lru_cache
+from typing import Annotated, List, Optional
+from pydantic import Field, field_validator
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
+
+
+# Shared by all settings classes so they read the same .env the same way
+_SHARED_SETTINGS_CONFIG = SettingsConfigDict(
+    env_file=".env",
+    env_file_encoding="utf-8",
+    case_sensitive=False,
+    extra="ignore"
+)
 
 
 class Settings(BaseSettings):
     """Application settings with environment variable support"""
     
     # API Configuration
-    app_name: str = Field(default="Building Detection API", env="APP_NAME")
-    app_version: str = Field(default="2.0.0", env="APP_VERSION") 
-    app_description: str = Field(
-        default="Asynchronous building detection using YOLOv8",
-        env="APP_DESCRIPTION"
-    )
-    debug: bool = Field(default=False, env="DEBUG")
+    app_name: str = Field(default="Building Detection API")
+    app_version: str = Field(default="2.0.0") 
+    app_description: str = Field(default="Asynchronous building detection using YOLOv8")
+    debug: bool = Field(default=False)
     
     # Server Configuration
-    host: str = Field(default="0.0.0.0", env="HOST")
-    port: int = Field(default=5050, env="PORT")
-    reload: bool = Field(default=True, env="RELOAD")
-    log_level: str = Field(default="info", env="LOG_LEVEL")
+    host: str = Field(default="0.0.0.0")
+    port: int = Field(default=5050)
+    reload: bool = Field(default=True)
+    log_level: str = Field(default="info")
     
     # CORS Configuration
-    cors_origins: List[str] = Field(default=["*"], env="CORS_ORIGINS")
-    cors_allow_credentials: bool = Field(default=True, env="CORS_ALLOW_CREDENTIALS")
-    cors_allow_methods: List[str] = Field(default=["*"], env="CORS_ALLOW_METHODS")
-    cors_allow_headers: List[str] = Field(default=["*"], env="CORS_ALLOW_HEADERS")
+    cors_origins: Annotated[List[str], NoDecode] = Field(default_factory=lambda: ["*"])
+    cors_allow_credentials: bool = Field(default=True)
+    cors_allow_methods: Annotated[List[str], NoDecode] = Field(default_factory=lambda: ["*"])
+    cors_allow_headers: Annotated[List[str], NoDecode] = Field(default_factory=lambda: ["*"])
     
     # Model Configuration
-    model_path: str = Field(default="best.pt", env="MODEL_PATH")
-    model_type: str = Field(default="YOLOv8", env="MODEL_TYPE")
+    model_path: str = Field(default="best.pt")
+    model_type: str = Field(default="YOLOv8")
+    use_tensorrt: bool = Field(default=False)  # Export/load a TensorRT FP16 engine on CUDA
+    tensorrt_max_batch_size: int = Field(default=16)  # Largest tile batch the engine accepts
     
     # Job Processing Configuration
-    max_concurrent_jobs: int = Field(default=2, env="MAX_CONCURRENT_JOBS")
-    job_cleanup_interval_hours: float = Field(default=1.0, env="JOB_CLEANUP_INTERVAL_HOURS")
+    max_concurrent_jobs: int = Field(default=2)  # Shared by async jobs and /detect/sync (sync requests wait, never 429)
+    max_queued_jobs: int = Field(default=8)  # Jobs allowed to wait for a free worker
+    job_cleanup_interval_hours: float = Field(default=1.0)
     
     # Detection Default Parameters
-    default_zoom: int = Field(default=18, env="DEFAULT_ZOOM")
-    default_confidence: float = Field(default=0.25, env="DEFAULT_CONFIDENCE")
-    default_batch_size: int = Field(default=5, env="DEFAULT_BATCH_SIZE")
-    default_enable_merging: bool = Field(default=True, env="DEFAULT_ENABLE_MERGING")
-    default_merge_iou_threshold: float = Field(default=0.1, env="DEFAULT_MERGE_IOU_THRESHOLD")
-    default_merge_touch_enabled: bool = Field(default=True, env="DEFAULT_MERGE_TOUCH_ENABLED")
-    default_merge_min_edge_distance_deg: float = Field(
-        default=0.00001, 
-        env="DEFAULT_MERGE_MIN_EDGE_DISTANCE_DEG"
-    )
+    default_zoom: int = Field(default=18)
+    default_confidence: float = Field(default=0.25)
+    default_batch_size: int = Field(default=5)
+    default_enable_merging: bool = Field(default=True)
+    default_merge_iou_threshold: float = Field(default=0.1)
+    default_merge_touch_enabled: bool = Field(default=True)
+    default_merge_min_edge_distance_deg: float = Field(default=0.00001)
     
     # Job ID Validation Configuration
-    job_id_min_length: int = Field(default=3, env="JOB_ID_MIN_LENGTH")
-    job_id_max_length: int = Field(default=50, env="JOB_ID_MAX_LENGTH")
+    job_id_min_length: int = Field(default=3)
+    job_id_max_length: int = Field(default=50)
     
     # Temporary Files Configuration
-    temp_dir_prefix: str = Field(default="detection_", env="TEMP_DIR_PREFIX")
-    cleanup_temp_files: bool = Field(default=True, env="CLEANUP_TEMP_FILES")
+    temp_dir_prefix: str = Field(default="detection_")
+    cleanup_temp_files: bool = Field(default=True)
+    temp_use_shm: bool = Field(default=True)  # Put job workspaces on /dev/shm when it exists
+    
+    model_config = _SHARED_SETTINGS_CONFIG
     
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        case_sensitive = False
+    @field_validator("cors_origins", "cors_allow_methods", "cors_allow_headers", mode="before")
+    @classmethod
+    def split_comma_separated(cls, v):
+        """Accept comma-separated env values (JSON arrays are still supported)"""
+        if isinstance(v, str):
+            v = v.strip()
+            if v.startswith("["):
+                return json.loads(v)
+            return [item.strip() for item in v.split(",") if item.strip()]
+        return v
 
 
 class DatabaseSettings(BaseSettings):
     """Database configuration (for future use)"""
     
-    database_url: Optional[str] = Field(default=None, env="DATABASE_URL")
-    database_echo: bool = Field(default=False, env="DATABASE_ECHO")
+    database_url: Optional[str] = Field(default=None)
+    database_echo: bool = Field(default=False)
     
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        extra = "ignore"
+    model_config = _SHARED_SETTINGS_CONFIG
 
 
 class SecuritySettings(BaseSettings):
     """Security configuration (for future use)"""
     
-    secret_key: str = Field(default="your-secret-key-here", env="SECRET_KEY")
-    access_token_expire_minutes: int = Field(default=30, env="ACCESS_TOKEN_EXPIRE_MINUTES")
-    algorithm: str = Field(default="HS256", env="ALGORITHM")
+    secret_key: str = Field(default="your-secret-key-here")
+    access_token_expire_minutes: int = Field(default=30)
+    algorithm: str = Field(default="HS256")
     
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        extra = "ignore"
-
-
-# Global settings instances
-settings = Settings()
-db_settings = DatabaseSettings()
-security_settings = SecuritySettings()
+    model_config = _SHARED_SETTINGS_CONFIG
 
 
+# Settings are built on first use and cached, so each .env parse happens once
+# per process and only for the settings classes actually used
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     """Get application settings"""
-    return settings
+    return Settings()
 
 
+@lru_cache(maxsize=1)
 def get_db_settings() -> DatabaseSettings:
     """Get database settings"""
-    return db_settings
+    return DatabaseSettings()
 
 
+@lru_cache(maxsize=1)
 def get_security_settings() -> SecuritySettings:
     """Get security settings"""
-    return security_settings
+    return SecuritySettings()
+
+
+_LAZY_SETTINGS = {
+    "settings": get_settings,
+    "db_settings": get_db_settings,
+    "security_settings": get_security_settings,
+}
+
+
+def __getattr__(name: str):
+    """Resolve the legacy module-level settings instances lazily"""
+    if name in _LAZY_SETTINGS:
+        return _LAZY_SETTINGS[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # Configuration validation
 def validate_configuration():
     """Validate configuration on startup"""
+    settings = get_settings()
     errors = []
     
     # Validate model path
@@ -127,6 +152,15 @@ def validate_configuration():
     if settings.max_concurrent_jobs <= 0:
         errors.append(f"Max concurrent jobs must be positive: {settings.max_concurrent_jobs}")
     
+    if settings.job_cleanup_interval_hours <= 0:
+        errors.append(f"Job cleanup interval must be positive: {settings.job_cleanup_interval_hours}")
+    
+    if settings.max_queued_jobs < 0:
+        errors.append(f"Max queued jobs cannot be negative: {settings.max_queued_jobs}")
+    
+    if settings.use_tensorrt and settings.tensorrt_max_batch_size <= 0:
+        errors.append(f"TensorRT max batch size must be positive: {settings.tensorrt_max_batch_size}")
+    
     # Validate job ID length constraints
     if settings.job_id_min_length >= settings.job_id_max_length:
         errors.append("Job ID min length must be less than max length")
@@ -140,11 +174,12 @@ def validate_configuration():
 
 def print_configuration():
     """Print current configuration (excluding sensitive data)"""
+    settings = get_settings()
     print("🔧 Building Detection API Configuration:")
     print(f"   App: {settings.app_name} v{settings.app_version}")
     print(f"   Host: {settings.host}:{settings.port}")
     print(f"   Model: {settings.model_path} ({settings.model_type})")
-    print(f"   Max Jobs: {settings.max_concurrent_jobs}")
+    print(f"   Max Jobs: {settings.max_concurrent_jobs} (+{settings.max_queued_jobs} queued)")
     print(f"   Debug: {settings.debug}")
     print(f"   Log Level: {settings.log_level}")
     print("=" * 50) 
\ No newline at end of file
@@ -1,32 +1,83 @@
 """Dependency injection for Building Detection API"""
 
-from typing import Optional
-from concurrent.futures import ThreadPoolExecutor
-from fastapi import Depends, HTTPException
+import asyncio
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Set, TYPE_CHECKING
+
+import anyio
+from fastapi import HTTPException
 
 from .config import get_settings, Settings
-from .services import job_manager
+from .utils.logging import get_logger
+
+if TYPE_CHECKING:
+    from .services.job_manager import JobManager
+
+logger = get_logger(__name__)
+
+
+# Job manager is imported on first use so that importing `api` does not pull in
+# the services package (and the detection pipeline behind it)
+_job_manager = None
+
+
+def _get_job_manager() -> "JobManager":
+    """Resolve the global job manager lazily"""
+    global _job_manager
+    if _job_manager is None:
+        from .services import job_manager
+        _job_manager = job_manager
+    return _job_manager
+
+
+@dataclass(frozen=True, slots=True)
+class ConfigurableDefaults:
+    """Snapshot of configurable default detection parameters"""
+    zoom: int
+    confidence: float
+    batch_size: int
+    enable_merging: bool
+    merge_iou_threshold: float
+    merge_touch_enabled: bool
+    merge_min_edge_distance_deg: float
+    
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "ConfigurableDefaults":
+        """Build the defaults snapshot from application settings"""
+        return cls(
+            zoom=settings.default_zoom,
+            confidence=settings.default_confidence,
+            batch_size=settings.default_batch_size,
+            enable_merging=settings.default_enable_merging,
+            merge_iou_threshold=settings.default_merge_iou_threshold,
+            merge_touch_enabled=settings.default_merge_touch_enabled,
+            merge_min_edge_distance_deg=settings.default_merge_min_edge_distance_deg
+        )
 
 
 class AppDependencies:
     """Centralized dependency management"""
     
+    __slots__ = ("model", "job_limiter", "job_slots", "_settings", "_defaults")
+    
     def __init__(self):
         self.model = None
-        self.executor = None
-        self._settings = None
+        self.set_settings(get_settings())
     
     def set_model(self, model):
         """Set the YOLOv8 model instance"""
         self.model = model
     
-    def set_executor(self, executor: ThreadPoolExecutor):
-        """Set the thread pool executor"""
-        self.executor = executor
-    
     def set_settings(self, settings: Settings):
-        """Set the application settings"""
+        """Set the application settings and snapshot the detection defaults"""
         self._settings = settings
+        self._defaults = ConfigurableDefaults.from_settings(settings)
+        self.job_limiter = anyio.CapacityLimiter(settings.max_concurrent_jobs)
+        self.job_slots = threading.BoundedSemaphore(
+            settings.max_concurrent_jobs + settings.max_queued_jobs
+        )
     
     def get_model(self):
         """Get the YOLOv8 model instance"""
@@ -37,45 +88,40 @@ class AppDependencies:
             )
         return self.model
     
-    def get_executor(self) -> ThreadPoolExecutor:
-        """Get the thread pool executor"""
-        if self.executor is None:
-            raise HTTPException(
-                status_code=503,
-                detail="Executor not initialized. Please check server configuration."
-            )
-        return self.executor
-    
     def get_settings(self) -> Settings:
         """Get application settings"""
-        if self._settings is None:
-            self._settings = get_settings()
         return self._settings
+    
+    def get_job_limiter(self) -> anyio.CapacityLimiter:
+        """Get the limiter bounding concurrently running detection jobs"""
+        return self.job_limiter
+    
+    def reserve_job_slot(self) -> bool:
+        """Reserve a running/queued job slot without blocking"""
+        return self.job_slots.acquire(blocking=False)
+    
+    def release_job_slot(self):
+        """Release a slot taken with reserve_job_slot"""
+        self.job_slots.release()
+    
+    def get_defaults(self) -> ConfigurableDefaults:
+        """Get the configurable default detection parameters"""
+        return self._defaults
 
 
 # Global dependencies instance
 app_dependencies = AppDependencies()
 
 
-# Dependency functions for FastAPI
-def get_model():
-    """Dependency function to get model"""
-    return app_dependencies.get_model()
+# Dependency callables for FastAPI (bound methods, no wrapper frames)
+get_model = app_dependencies.get_model
+get_app_settings = app_dependencies.get_settings
 
 
-def get_executor() -> ThreadPoolExecutor:
-    """Dependency function to get executor"""
-    return app_dependencies.get_executor()
-
-
-def get_app_settings() -> Settings:
-    """Dependency function to get settings"""
-    return app_dependencies.get_settings()
-
-
-def get_job_manager():
+@lru_cache(maxsize=1)
+def get_job_manager() -> "JobManager":
     """Dependency function to get job manager"""
-    return job_manager
+    return _get_job_manager()
 
 
 def validate_model_loaded():
@@ -89,86 +135,59 @@ def validate_model_loaded():
     return model
 
 
-def validate_server_capacity(settings: Settings = Depends(get_app_settings)):
-    """Dependency to validate server capacity for new jobs"""
-    active_count = job_manager.get_active_job_count()
-    if active_count >= settings.max_concurrent_jobs:
-        raise HTTPException(
-            status_code=429,
-            detail=f"Server at capacity. Maximum {settings.max_concurrent_jobs} concurrent jobs allowed. Currently processing: {active_count}"
-        )
-    return True
+# Utility dependencies
+# Strong references to running job tasks so they are not garbage collected
+_background_jobs: Set[asyncio.Task] = set()
 
 
-# Utility dependencies
 def get_background_processor():
     """Dependency to get background processing function"""
     def submit_job_to_background_processing(job_id: str):
-        """Submit job to background processing queue"""
+        """
+        Submit job to background processing queue
+        
+        The caller must hold a slot from `reserve_job_slot`; it is released
+        when the job finishes.
+        """
         from .services.detection import detection_service
         
-        print(f"🔄 Submitting job {job_id} to background processing queue")
+        logger.info(f"🔄 Submitting job {job_id} to background processing queue")
         
         # Get dependencies
         model = app_dependencies.get_model()
-        executor = app_dependencies.get_executor()
+        limiter = app_dependencies.get_job_limiter()
         
-        # Submit real processing to thread pool
-        future = executor.submit(detection_service.process_detection_job, job_id, model)
+        # Run on the event loop's worker threads, at most max_concurrent_jobs at a time;
+        # jobs beyond that wait on the limiter instead of being rejected
+        async def run_job():
+            try:
+                await anyio.to_thread.run_sync(
+                    detection_service.process_detection_job, job_id, model, limiter=limiter
+                )
+            finally:
+                app_dependencies.release_job_slot()
         
-        # Store future reference in job for potential cancellation
-        job = job_manager.get_job(job_id)
-        if job:
-            job.request_params['_future'] = future
+        task = asyncio.create_task(run_job())
+        _background_jobs.add(task)
+        task.add_done_callback(_background_jobs.discard)
+        
+        # Track the task next to the job (not in request_params) for cancellation
+        job_manager = _get_job_manager()
+        job_manager.set_job_task(job_id, task)
+        task.add_done_callback(lambda _: job_manager.discard_job_task(job_id))
     
     return submit_job_to_background_processing
 
 
-class ConfigurableDefaults:
-    """Dependency class for configurable default values"""
-    
-    def __init__(self, settings: Settings = Depends(get_app_settings)):
-        self.settings = settings
-    
-    @property
-    def zoom(self) -> int:
-        return self.settings.default_zoom
-    
-    @property
-    def confidence(self) -> float:
-        return self.settings.default_confidence
-    
-    @property
-    def batch_size(self) -> int:
-        return self.settings.default_batch_size
-    
-    @property
-    def enable_merging(self) -> bool:
-        return self.settings.default_enable_merging
-    
-    @property
-    def merge_iou_threshold(self) -> float:
-        return self.settings.default_merge_iou_threshold
-    
-    @property
-    def merge_touch_enabled(self) -> bool:
-        return self.settings.default_merge_touch_enabled
-    
-    @property
-    def merge_min_edge_distance_deg(self) -> float:
-        return self.settings.default_merge_min_edge_distance_deg
-
-
 def get_configurable_defaults() -> ConfigurableDefaults:
     """Dependency function to get configurable defaults"""
-    return ConfigurableDefaults()
+    return app_dependencies.get_defaults()
 
 
 # Initialization functions
-def initialize_dependencies(model, executor: ThreadPoolExecutor, settings: Settings):
+def initialize_dependencies(model, settings: Settings):
     """Initialize all dependencies"""
     app_dependencies.set_model(model)
-    app_dependencies.set_executor(executor)
     app_dependencies.set_settings(settings)
     
     print("✅ Dependencies initialized successfully")
@@ -176,8 +195,4 @@ def initialize_dependencies(model, executor: ThreadPoolExecutor, settings: Setti
 
 def cleanup_dependencies():
     """Cleanup dependencies on shutdown"""
-    if app_dependencies.executor:
-        app_dependencies.executor.shutdown(wait=True)
-        print("🧹 Executor shutdown completed")
-    
     print("✅ Dependencies cleaned up successfully") 
\ No newline at end of file
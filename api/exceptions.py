@@ -1,13 +1,14 @@
 """Custom exceptions and exception handlers for Building Detection API"""
 
 from fastapi import Request, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
-import traceback
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Optional, Tuple
 import logging
 
+logger = logging.getLogger(__name__)
+
 
 # Custom exceptions
 class ModelNotLoadedException(Exception):
@@ -40,89 +41,109 @@ class ConfigurationException(Exception):
     pass
 
 
+# Static parts of the error payloads; handlers only add the per-error detail
+_MODEL_NOT_LOADED_CONTENT = {
+    "error": "Model Not Available",
+    "message": "YOLOv8 model is not loaded. Please check server configuration.",
+    "type": "model_error"
+}
+
+_JOB_NOT_FOUND_CONTENT = {
+    "error": "Job Not Found",
+    "message": "The requested job ID was not found.",
+    "type": "job_error"
+}
+
+_JOB_VALIDATION_CONTENT = {
+    "error": "Job Validation Error",
+    "message": "Job validation failed.",
+    "type": "validation_error"
+}
+
+_SERVER_CAPACITY_CONTENT = {
+    "error": "Server at Capacity",
+    "message": "Server is currently processing the maximum number of concurrent jobs.",
+    "type": "capacity_error"
+}
+
+_DETECTION_PROCESSING_CONTENT = {
+    "error": "Detection Processing Error",
+    "message": "An error occurred during building detection processing.",
+    "type": "processing_error"
+}
+
+_CONFIGURATION_CONTENT = {
+    "error": "Configuration Error",
+    "message": "Server configuration is invalid.",
+    "type": "config_error"
+}
+
+_VALIDATION_ERROR_CONTENT = {
+    "error": "Validation Error",
+    "message": "Request validation failed",
+    "type": "validation_error"
+}
+
+_SERVER_ERROR_CONTENT = {
+    "error": "Internal Server Error",
+    "message": "An unexpected error occurred. Please try again later.",
+    "type": "server_error"
+}
+
+
 # Exception handlers
 async def model_not_loaded_handler(request: Request, exc: ModelNotLoadedException):
     """Handle model not loaded exception"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=503,
-        content={
-            "error": "Model Not Available",
-            "message": "YOLOv8 model is not loaded. Please check server configuration.",
-            "detail": str(exc),
-            "type": "model_error"
-        }
+        content={**_MODEL_NOT_LOADED_CONTENT, "detail": str(exc)}
     )
 
 
 async def job_not_found_handler(request: Request, exc: JobNotFoundException):
     """Handle job not found exception"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=404,
-        content={
-            "error": "Job Not Found",
-            "message": "The requested job ID was not found.",
-            "detail": str(exc),
-            "type": "job_error"
-        }
+        content={**_JOB_NOT_FOUND_CONTENT, "detail": str(exc)}
     )
 
 
 async def job_validation_handler(request: Request, exc: JobValidationException):
     """Handle job validation exception"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=400,
-        content={
-            "error": "Job Validation Error",
-            "message": "Job validation failed.",
-            "detail": str(exc),
-            "type": "validation_error"
-        }
+        content={**_JOB_VALIDATION_CONTENT, "detail": str(exc)}
     )
 
 
 async def server_capacity_handler(request: Request, exc: ServerCapacityException):
     """Handle server capacity exception"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=429,
-        content={
-            "error": "Server at Capacity",
-            "message": "Server is currently processing the maximum number of concurrent jobs.",
-            "detail": str(exc),
-            "type": "capacity_error"
-        }
+        content={**_SERVER_CAPACITY_CONTENT, "detail": str(exc)}
     )
 
 
 async def detection_processing_handler(request: Request, exc: DetectionProcessingException):
     """Handle detection processing exception"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
-        content={
-            "error": "Detection Processing Error",
-            "message": "An error occurred during building detection processing.",
-            "detail": str(exc),
-            "type": "processing_error"
-        }
+        content={**_DETECTION_PROCESSING_CONTENT, "detail": str(exc)}
     )
 
 
 async def configuration_handler(request: Request, exc: ConfigurationException):
     """Handle configuration exception"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
-        content={
-            "error": "Configuration Error",
-            "message": "Server configuration is invalid.",
-            "detail": str(exc),
-            "type": "config_error"
-        }
+        content={**_CONFIGURATION_CONTENT, "detail": str(exc)}
     )
 
 
 # Default FastAPI exception handlers
 async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     """Enhanced HTTP exception handler with better error format"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={
             "error": f"HTTP {exc.status_code}",
@@ -145,51 +166,48 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
             "input": error.get("input")
         })
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=422,
-        content={
-            "error": "Validation Error",
-            "message": "Request validation failed",
-            "detail": errors,
-            "type": "validation_error"
-        }
+        content={**_VALIDATION_ERROR_CONTENT, "detail": errors}
     )
 
 
 async def general_exception_handler(request: Request, exc: Exception):
     """General exception handler for unhandled exceptions"""
-    # Log the full traceback for debugging
-    logging.error(f"Unhandled exception: {exc}")
-    logging.error(traceback.format_exc())
+    # Log the full traceback for debugging (formatted only if the record is emitted)
+    logger.error("Unhandled exception: %s", exc, exc_info=exc)
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
-        content={
-            "error": "Internal Server Error",
-            "message": "An unexpected error occurred. Please try again later.",
-            "detail": str(exc),
-            "type": "server_error"
-        }
+        content={**_SERVER_ERROR_CONTENT, "detail": str(exc)}
     )
 
 
-# Exception mapping
-EXCEPTION_HANDLERS = {
-    ModelNotLoadedException: model_not_loaded_handler,
-    JobNotFoundException: job_not_found_handler,
-    JobValidationException: job_validation_handler,
-    ServerCapacityException: server_capacity_handler,
-    DetectionProcessingException: detection_processing_handler,
-    ConfigurationException: configuration_handler,
-    StarletteHTTPException: http_exception_handler,
-    RequestValidationError: validation_exception_handler,
-    Exception: general_exception_handler,
-}
+# Exception mapping, built on first registration
+_HANDLERS: Optional[Tuple[Tuple[type, Callable], ...]] = None
+
+
+def _get_handlers() -> Tuple[Tuple[type, Callable], ...]:
+    """Get the (exception type, handler) pairs to register"""
+    global _HANDLERS
+    if _HANDLERS is None:
+        _HANDLERS = (
+            (ModelNotLoadedException, model_not_loaded_handler),
+            (JobNotFoundException, job_not_found_handler),
+            (JobValidationException, job_validation_handler),
+            (ServerCapacityException, server_capacity_handler),
+            (DetectionProcessingException, detection_processing_handler),
+            (ConfigurationException, configuration_handler),
+            (StarletteHTTPException, http_exception_handler),
+            (RequestValidationError, validation_exception_handler),
+            (Exception, general_exception_handler),
+        )
+    return _HANDLERS
 
 
 def register_exception_handlers(app):
     """Register all exception handlers with FastAPI app"""
-    for exception_type, handler in EXCEPTION_HANDLERS.items():
+    for exception_type, handler in _get_handlers():
         app.add_exception_handler(exception_type, handler)
     
     print("✅ Exception handlers registered successfully")
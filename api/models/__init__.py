@@ -1,5 +1,13 @@
 """Models package - contains all Pydantic models for the API"""
 
+from .geojson import (
+    GeoJSONPolygon,
+    GeoJSONMultiPolygon,
+    GeoJSONOtherGeometry,
+    GeoJSONFeature,
+    GeoJSONFeatureCollection,
+    GeoJSONInput
+)
 from .job import JobStatus, JobInfo
 from .requests import PolygonRequest, validate_job_id_format
 from .responses import (
@@ -11,6 +19,14 @@ from .responses import (
 )
 
 __all__ = [
+    # GeoJSON models
+    "GeoJSONPolygon",
+    "GeoJSONMultiPolygon",
+    "GeoJSONOtherGeometry",
+    "GeoJSONFeature",
+    "GeoJSONFeatureCollection",
+    "GeoJSONInput",
+    
     # Job models
     "JobStatus",
     "JobInfo",
@@ -0,0 +1,67 @@
+"""GeoJSON models for polygon input"""
+
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Annotated, Dict, Any, List, Literal, Optional, Union
+
+
+# [longitude, latitude] (optionally with altitude)
+Position = List[float]
+
+# Unknown members are ignored rather than forbidden: GeoJSON objects may carry
+# "bbox", "id", "crs" or other foreign members (RFC 7946, section 6.1) that
+# clients already send
+
+
+class GeoJSONPolygon(BaseModel):
+    """GeoJSON Polygon geometry"""
+    model_config = ConfigDict(defer_build=True, extra="ignore")
+
+    type: Literal["Polygon"]
+    coordinates: List[List[Position]]
+
+
+class GeoJSONMultiPolygon(BaseModel):
+    """GeoJSON MultiPolygon geometry"""
+    model_config = ConfigDict(defer_build=True, extra="ignore")
+
+    type: Literal["MultiPolygon"]
+    coordinates: List[List[List[Position]]]
+
+
+class GeoJSONOtherGeometry(BaseModel):
+    """Non-polygon GeoJSON geometry; accepted inside features and skipped by detection"""
+    model_config = ConfigDict(defer_build=True, extra="ignore")
+
+    type: Literal["Point", "MultiPoint", "LineString", "MultiLineString", "GeometryCollection"]
+    coordinates: Optional[Any] = None
+    geometries: Optional[List[Any]] = None
+
+
+GeoJSONGeometry = Annotated[
+    Union[GeoJSONPolygon, GeoJSONMultiPolygon, GeoJSONOtherGeometry],
+    Field(discriminator="type")
+]
+
+
+class GeoJSONFeature(BaseModel):
+    """GeoJSON Feature; only polygon geometries are used for detection"""
+    model_config = ConfigDict(defer_build=True, extra="ignore")
+
+    type: Literal["Feature"]
+    geometry: GeoJSONGeometry
+    properties: Optional[Dict[str, Any]] = None
+
+
+class GeoJSONFeatureCollection(BaseModel):
+    """GeoJSON FeatureCollection; mixed geometry types are allowed, polygons are used"""
+    model_config = ConfigDict(defer_build=True, extra="ignore")
+
+    type: Literal["FeatureCollection"]
+    features: List[GeoJSONFeature]
+
+
+# Any GeoJSON object accepted as a detection area
+GeoJSONInput = Annotated[
+    Union[GeoJSONPolygon, GeoJSONMultiPolygon, GeoJSONFeature, GeoJSONFeatureCollection],
+    Field(discriminator="type")
+]
@@ -1,11 +1,12 @@
 """Job-related models and enums"""
 
-from pydantic import BaseModel
-from typing import Dict, Any, Optional
-from enum import Enum
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, Tuple
+from enum import StrEnum
+from .geojson import GeoJSONInput
 
 
-class JobStatus(str, Enum):
+class JobStatus(StrEnum):
     """Job status enumeration"""
     QUEUED = "queued"
     PROCESSING = "processing" 
@@ -14,16 +15,31 @@ class JobStatus(str, Enum):
     CANCELLED = "cancelled"
 
 
-class JobInfo(BaseModel):
-    """Job information model"""
+@dataclass(slots=True)
+class JobInfo:
+    """Job information record
+    
+    A slotted dataclass rather than a Pydantic model: it is only built by the
+    job manager from already validated input, and its fields are read on every
+    status poll. API payloads use the models in `responses`.
+    """
     job_id: str
     status: JobStatus
+    start_time: float
+    polygon: Optional[GeoJSONInput]  # Dropped once the job has finished
+    request_params: Dict[str, Any]
     progress: int = 0  # 0-100
     stage: str = "Initializing"
     buildings_found: int = 0
-    start_time: float
     end_time: Optional[float] = None
     execution_time: Optional[float] = None
     error_message: Optional[str] = None
-    polygon: Dict[str, Any]
-    request_params: Dict[str, Any] 
\ No newline at end of file
+    result_data: Optional[Dict[str, Any]] = None
+    
+    # (progress, formatted ETA, computed at) from the last status poll
+    _eta_cache: Optional[Tuple[int, Optional[str], float]] = field(default=None, init=False, repr=False)
+    # Monotonic time of the last applied progress update
+    _last_progress_at: float = field(default=0.0, init=False, repr=False)
+    # Monotonic clock readings for duration math (start_time/end_time are wall-clock)
+    _started_monotonic: float = field(default=0.0, init=False, repr=False)
+    _finished_monotonic: Optional[float] = field(default=None, init=False, repr=False)
@@ -1,7 +1,14 @@
 """Request models for API endpoints"""
 
-from pydantic import BaseModel, validator
-from typing import Dict, Any, Optional
+import re
+from pydantic import BaseModel, field_validator
+from typing import Optional
+from .geojson import GeoJSONInput
+
+
+# Compiled once at import: 3-50 chars, alphanumeric at both ends,
+# alphanumeric/hyphen/underscore in between
+_JOB_ID_RE = re.compile(r'[A-Za-z0-9][A-Za-z0-9_-]{1,48}[A-Za-z0-9]')
 
 
 def validate_job_id_format(job_id: str) -> bool:
@@ -14,25 +21,13 @@ def validate_job_id_format(job_id: str) -> bool:
     - Must start with letter or number
     - Cannot end with hyphen or underscore
     """
-    if not job_id or len(job_id) < 3 or len(job_id) > 50:
-        return False
-    
-    # Check start and end characters
-    if not (job_id[0].isalnum() and job_id[-1].isalnum()):
-        return False
-    
-    # Check all characters are allowed (alphanumeric, hyphen, underscore)
-    allowed_chars = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_')
-    if not all(c in allowed_chars for c in job_id):
-        return False
-    
-    return True
+    return bool(job_id) and _JOB_ID_RE.fullmatch(job_id) is not None
 
 
 class PolygonRequest(BaseModel):
     """Request model for polygon detection"""
     job_id: Optional[str] = None  # Optional custom job ID
-    polygon: Dict[str, Any]  # GeoJSON polygon
+    polygon: GeoJSONInput  # GeoJSON polygon, feature or feature collection
     zoom: Optional[int] = 18
     confidence: Optional[float] = 0.25
     batch_size: Optional[int] = 5
@@ -41,9 +36,10 @@ class PolygonRequest(BaseModel):
     merge_touch_enabled: Optional[bool] = True
     merge_min_edge_distance_deg: Optional[float] = 0.00001
 
-    @validator('job_id')
+    @field_validator('job_id')
+    @classmethod
     def validate_job_id_if_provided(cls, v):
         """Validate job_id format if provided (uniqueness checked later)"""
-        if v is not None and not validate_job_id_format(v):
+        if v is not None and _JOB_ID_RE.fullmatch(v) is None:
             raise ValueError("job_id must be 3-50 characters, alphanumeric with hyphens/underscores, cannot start/end with special characters")
         return v 
\ No newline at end of file
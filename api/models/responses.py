@@ -1,11 +1,27 @@
-"""Response models for API endpoints"""
+"""Response models for API endpoints
 
-from pydantic import BaseModel
+These models are only built by our own routers from trusted data, so they are
+frozen and constructed with `model_construct` to skip re-validation. Hot
+endpoints return `to_response()` so FastAPI does not validate and serialize
+them again through `response_model`, which is kept for the OpenAPI schema.
+"""
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict
 from typing import Dict, Any, List, Optional
 from .job import JobStatus
 
 
-class DetectionResponse(BaseModel):
+class TrustedResponse(BaseModel):
+    """Base for response models built from trusted data"""
+    model_config = ConfigDict(defer_build=True, frozen=True, extra="forbid")
+
+    def to_response(self, status_code: int = 200) -> ORJSONResponse:
+        """Encode the fields directly with orjson, bypassing response_model handling"""
+        return ORJSONResponse(dict(self), status_code=status_code)
+
+
+class DetectionResponse(TrustedResponse):
     """Response model for synchronous detection"""
     success: bool
     message: str
@@ -15,14 +31,14 @@ class DetectionResponse(BaseModel):
     execution_time: Optional[float] = None
 
 
-class HealthResponse(BaseModel):
+class HealthResponse(TrustedResponse):
     """Response model for health check"""
     status: str
     model_loaded: bool
     timestamp: str
 
 
-class JobSubmissionResponse(BaseModel):
+class JobSubmissionResponse(TrustedResponse):
     """Response when submitting a new job"""
     job_id: str
     status: JobStatus
@@ -30,7 +46,7 @@ class JobSubmissionResponse(BaseModel):
     submitted_at: str
 
 
-class JobStatusResponse(BaseModel):
+class JobStatusResponse(TrustedResponse):
     """Response for job status checks"""
     job_id: str
     status: JobStatus
@@ -42,7 +58,7 @@ class JobStatusResponse(BaseModel):
     error_message: Optional[str] = None
 
 
-class JobResultResponse(BaseModel):
+class JobResultResponse(TrustedResponse):
     """Response for completed job results"""
     job_id: str
     status: JobStatus
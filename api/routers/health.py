@@ -1,38 +1,26 @@
 """Health check and system info endpoints"""
 
-from datetime import datetime
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends
+from api.config import Settings
+from api.dependencies import app_dependencies, get_app_settings, get_model
 from api.models import HealthResponse
 from api.services import job_manager
+from api.utils.clock import iso_now
 
 # Create router instance
 router = APIRouter(tags=["health"])
 
-# Global instances (will be set by main app)
-model = None
-max_concurrent_jobs = 10  # Default value
-
-def set_model(model_instance):
-    """Set the model instance for this router"""
-    global model
-    model = model_instance
-
-def set_max_concurrent_jobs(max_jobs):
-    """Set the max concurrent jobs for this router"""
-    global max_concurrent_jobs
-    max_concurrent_jobs = max_jobs
-
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint"""
-    return HealthResponse(
+    return HealthResponse.model_construct(
         status="healthy",
-        model_loaded=model is not None,
-        timestamp=datetime.now().isoformat()
-    )
+        model_loaded=app_dependencies.model is not None,
+        timestamp=iso_now()
+    ).to_response()
 
 @router.get("/")
-async def root():
+async def root(settings: Settings = Depends(get_app_settings)):
     """Root endpoint with API information"""
     return {
         "message": "Building Detection API",
@@ -48,17 +36,14 @@ async def root():
             "docs": "/docs"
         },
         "concurrent_jobs": {
-            "max_allowed": max_concurrent_jobs,
+            "max_allowed": settings.max_concurrent_jobs,
             "currently_active": job_manager.get_active_job_count()
         }
     }
 
 @router.get("/model/info")
-async def model_info():
+async def model_info(model=Depends(get_model)):
     """Get information about the loaded model"""
-    if model is None:
-        raise HTTPException(status_code=503, detail="Model not loaded")
-    
     return {
         "model_loaded": True,
         "model_type": "YOLOv8", 
@@ -1,23 +1,37 @@
 """Job management endpoints"""
 
 import time
-from datetime import datetime
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse
 
+from api.config import Settings
+from api.dependencies import get_app_settings
 from api.models import JobStatusResponse, JobResultResponse, JobStatus
 from api.services import job_manager
+from api.utils.clock import iso_now
 
 # Create router instances
 router = APIRouter(prefix="/job", tags=["jobs"])
 jobs_list_router = APIRouter(tags=["jobs"])
 
-# Global configuration
-MAX_CONCURRENT_JOBS = None
+# How long a computed ETA is reused while progress has not moved (seconds)
+ETA_CACHE_TTL = 0.5
 
-def set_max_concurrent_jobs(max_jobs):
-    """Set max concurrent jobs configuration"""
-    global MAX_CONCURRENT_JOBS
-    MAX_CONCURRENT_JOBS = max_jobs
+def _estimate_time_remaining(job) -> Optional[str]:
+    """Estimate remaining time from progress so far, reusing a recent estimate"""
+    now = time.monotonic()
+    cached = job._eta_cache
+    if cached is not None and cached[0] == job.progress and now - cached[2] < ETA_CACHE_TTL:
+        return cached[1]
+    
+    elapsed_time = now - job._started_monotonic
+    total_estimated_time = (elapsed_time / job.progress) * 100
+    remaining_time = total_estimated_time - elapsed_time
+    estimated_time_remaining = f"{int(remaining_time)} seconds" if remaining_time > 0 else None
+    
+    job._eta_cache = (job.progress, estimated_time_remaining, now)
+    return estimated_time_remaining
 
 @router.get("/{job_id}", response_model=JobStatusResponse)
 async def get_job_status(job_id: str):
@@ -42,16 +56,11 @@ async def get_job_status(job_id: str):
     
     # Calculate estimated time remaining
     estimated_time_remaining = None
-    if job.status == JobStatus.PROCESSING and job.progress > 0:
-        elapsed_time = time.time() - job.start_time
-        if job.progress > 5:  # Only estimate after some progress
-            total_estimated_time = (elapsed_time / job.progress) * 100
-            remaining_time = total_estimated_time - elapsed_time
-            if remaining_time > 0:
-                estimated_time_remaining = f"{int(remaining_time)} seconds"
+    if job.status == JobStatus.PROCESSING and job.progress > 5:  # Only estimate after some progress
+        estimated_time_remaining = _estimate_time_remaining(job)
     
     # Return current job status
-    return JobStatusResponse(
+    return JobStatusResponse.model_construct(
         job_id=job.job_id,
         status=job.status,
         progress=job.progress,
@@ -60,7 +69,7 @@ async def get_job_status(job_id: str):
         estimated_time_remaining=estimated_time_remaining,
         execution_time=job.execution_time,
         error_message=job.error_message
-    )
+    ).to_response()
 
 @router.get("/{job_id}/result", response_model=JobResultResponse)
 async def get_job_result(job_id: str):
@@ -112,7 +121,7 @@ async def get_job_result(job_id: str):
         )
     
     # Get result data from job
-    result_data = job.request_params.get('result_data', {})
+    result_data = job.result_data or {}
     buildings_data = result_data.get('buildings', [])
     total_buildings = result_data.get('total_buildings', len(buildings_data))
     
@@ -121,13 +130,13 @@ async def get_job_result(job_id: str):
         buildings_data = []
         total_buildings = 0
     
-    return JobResultResponse(
+    return JobResultResponse.model_construct(
         job_id=job.job_id,
         status=job.status,
         buildings=buildings_data,
         total_buildings=total_buildings,
         execution_time=job.execution_time or 0
-     )
+     ).to_response()
 
 @router.delete("/{job_id}")
 async def cancel_job(job_id: str):
@@ -159,22 +168,37 @@ async def cancel_job(job_id: str):
         "job_id": job_id,
         "status": "cancelled",
         "message": "Job has been cancelled successfully",
-        "cancelled_at": datetime.now().isoformat()
+        "cancelled_at": iso_now()
     }
 
 # Jobs list endpoint on separate router
 @jobs_list_router.get("/jobs")
-async def list_all_jobs():
+async def list_all_jobs(
+    request: Request,
+    cursor: Optional[int] = Query(default=None, ge=0),
+    limit: Optional[int] = Query(default=None, ge=1, le=1000),
+    settings: Settings = Depends(get_app_settings)
+):
     """
     List all jobs in the system (for debugging and monitoring)
     
-    Returns summary of all jobs with their current status
+    Returns summary of all jobs with their current status, newest first.
+    Pass `limit` to page through jobs and `cursor` (the `next_cursor` of the
+    previous page) to continue. Responses carry an ETag that changes whenever
+    any job changes; send it back in If-None-Match to get 304 when nothing did.
     """
-    jobs_summary = job_manager.get_all_jobs()
-    
-    return {
-        "total_jobs": len(jobs_summary),
-        "active_jobs": job_manager.get_active_job_count(),
-        "max_concurrent": MAX_CONCURRENT_JOBS or 10,
-        "jobs": jobs_summary
-     } 
\ No newline at end of file
+    if request.headers.get("if-none-match") == f'"{job_manager.get_version()}"':
+        return Response(status_code=304)
+    
+    version, jobs_summary, next_cursor = job_manager.get_jobs_page(cursor=cursor, limit=limit)
+    
+    return ORJSONResponse(
+        {
+            "total_jobs": job_manager.get_job_count(),
+            "active_jobs": job_manager.get_active_job_count(),
+            "max_concurrent": settings.max_concurrent_jobs,
+            "jobs": jobs_summary,
+            "next_cursor": next_cursor
+        },
+        headers={"ETag": f'"{version}"'}
+    )
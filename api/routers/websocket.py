@@ -1,8 +1,8 @@
 """WebSocket support for real-time job progress updates"""
 
-import json
+import orjson
 import asyncio
-from typing import Dict, Set
+from typing import Dict, Optional, Tuple
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from ..utils.logging import get_logger
 from ..services.job_manager import job_manager
@@ -10,80 +10,160 @@ from ..services.job_manager import job_manager
 router = APIRouter()
 logger = get_logger(__name__)
 
+# Pending outgoing messages per connection before the oldest get dropped
+SEND_QUEUE_SIZE = 64
+
+# Most queued messages packed into one "batch" frame
+SEND_BATCH_SIZE = 16
+
+# Progress updates for a job are coalesced to at most one per interval (seconds)
+PROGRESS_FLUSH_INTERVAL = 0.1
+
+
 # Store active WebSocket connections
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: Dict[str, Set[WebSocket]] = {}
-        self.job_connections: Dict[str, Set[WebSocket]] = {}
+        # Subscriber tuples are rebuilt on connect/disconnect (copy-on-write) so
+        # senders can iterate a snapshot without copying
+        self.active_connections: Dict[str, Tuple[WebSocket, ...]] = {}
+        self.job_connections: Dict[str, Tuple[WebSocket, ...]] = {}
+        # Per-connection send queue, drained by its own task so a slow client
+        # never holds up the sender or other subscribers
+        self.send_queues: Dict[WebSocket, asyncio.Queue] = {}
+        self.send_tasks: Dict[WebSocket, asyncio.Task] = {}
+        # Latest not-yet-sent progress update per job
+        self.pending_job_updates: Dict[str, dict] = {}
+        self.flush_task: Optional[asyncio.Task] = None
 
     async def connect(self, websocket: WebSocket, job_id: str = None):
         """Accept WebSocket connection and optionally subscribe to job updates"""
         await websocket.accept()
         
+        # Start the per-connection sender
+        self.send_queues[websocket] = asyncio.Queue(maxsize=SEND_QUEUE_SIZE)
+        self.send_tasks[websocket] = asyncio.create_task(self._send_loop(websocket))
+        
         # Add to general connections
-        if "general" not in self.active_connections:
-            self.active_connections["general"] = set()
-        self.active_connections["general"].add(websocket)
+        self.active_connections["general"] = (*self.active_connections.get("general", ()), websocket)
         
         # Add to job-specific connections if job_id provided
         if job_id:
-            if job_id not in self.job_connections:
-                self.job_connections[job_id] = set()
-            self.job_connections[job_id].add(websocket)
+            self.job_connections[job_id] = (*self.job_connections.get(job_id, ()), websocket)
             
         logger.info(f"WebSocket connected for job: {job_id or 'general'}")
 
     def disconnect(self, websocket: WebSocket, job_id: str = None):
         """Remove WebSocket connection"""
+        # Stop the per-connection sender
+        self.send_queues.pop(websocket, None)
+        send_task = self.send_tasks.pop(websocket, None)
+        if send_task:
+            send_task.cancel()
+        
         # Remove from general connections
         if "general" in self.active_connections:
-            self.active_connections["general"].discard(websocket)
+            self.active_connections["general"] = tuple(
+                ws for ws in self.active_connections["general"] if ws is not websocket
+            )
         
         # Remove from job-specific connections
         if job_id and job_id in self.job_connections:
-            self.job_connections[job_id].discard(websocket)
-            if not self.job_connections[job_id]:
+            remaining = tuple(ws for ws in self.job_connections[job_id] if ws is not websocket)
+            if remaining:
+                self.job_connections[job_id] = remaining
+            else:
                 del self.job_connections[job_id]
                 
         logger.info(f"WebSocket disconnected for job: {job_id or 'general'}")
 
-    async def send_personal_message(self, message: dict, websocket: WebSocket):
-        """Send message to specific WebSocket"""
+    async def _send_loop(self, websocket: WebSocket):
+        """Drain a connection's send queue until it closes or fails"""
+        queue = self.send_queues[websocket]
         try:
-            await websocket.send_text(json.dumps(message))
+            while True:
+                payload = await queue.get()
+                if not queue.empty():
+                    # Pack whatever else is already waiting into a single frame
+                    payloads = [payload]
+                    while not queue.empty() and len(payloads) < SEND_BATCH_SIZE:
+                        payloads.append(queue.get_nowait())
+                    payload = '{"type":"batch","updates":[' + ",".join(payloads) + ']}'
+                await websocket.send_text(payload)
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             logger.error(f"Failed to send WebSocket message: {e}")
+            # Stop queueing for this socket; its receive loop handles the disconnect
+            self.send_queues.pop(websocket, None)
+            self.send_tasks.pop(websocket, None)
+
+    def _enqueue(self, websocket: WebSocket, payload: str):
+        """Queue an encoded message for a connection, dropping its oldest one when full"""
+        queue = self.send_queues.get(websocket)
+        if queue is None:
+            return
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(payload)
+
+    async def send_personal_message(self, message: dict, websocket: WebSocket):
+        """Send message to specific WebSocket"""
+        self._enqueue(websocket, orjson.dumps(message).decode())
 
     async def send_job_update(self, job_id: str, message: dict):
         """Send update to all WebSockets subscribed to specific job"""
-        if job_id in self.job_connections:
-            disconnected = []
-            for connection in self.job_connections[job_id].copy():
-                try:
-                    await connection.send_text(json.dumps(message))
-                except Exception:
-                    disconnected.append(connection)
-            
-            # Remove disconnected connections
-            for connection in disconnected:
-                self.job_connections[job_id].discard(connection)
+        connections = self.job_connections.get(job_id)
+        if not connections:
+            return
+        
+        # Encode once for all subscribers
+        payload = orjson.dumps(message).decode()
+        for connection in connections:
+            self._enqueue(connection, payload)
+
+    def queue_job_update(self, job_id: str, message: dict):
+        """Queue a progress update; only the latest per job is sent each interval"""
+        self.pending_job_updates[job_id] = message
+        if self.flush_task is None or self.flush_task.done():
+            self.flush_task = asyncio.create_task(self._flush_job_updates())
+
+    async def flush_job_update(self, job_id: str):
+        """Send a job's pending progress update right away, if there is one"""
+        message = self.pending_job_updates.pop(job_id, None)
+        if message is not None:
+            await self.send_job_update(job_id, message)
+
+    async def _flush_job_updates(self):
+        """Send coalesced progress updates until none are pending"""
+        while self.pending_job_updates:
+            await asyncio.sleep(PROGRESS_FLUSH_INTERVAL)
+            pending, self.pending_job_updates = self.pending_job_updates, {}
+            for job_id, message in pending.items():
+                await self.send_job_update(job_id, message)
 
     async def broadcast(self, message: dict):
         """Broadcast message to all active connections"""
-        if "general" in self.active_connections:
-            disconnected = []
-            for connection in self.active_connections["general"].copy():
-                try:
-                    await connection.send_text(json.dumps(message))
-                except Exception:
-                    disconnected.append(connection)
-            
-            # Remove disconnected connections
-            for connection in disconnected:
-                self.active_connections["general"].discard(connection)
+        connections = self.active_connections.get("general")
+        if not connections:
+            return
+        
+        # Encode once for all connections
+        payload = orjson.dumps(message).decode()
+        for connection in connections:
+            self._enqueue(connection, payload)
 
 manager = ConnectionManager()
 
+async def _receive_json(websocket: WebSocket):
+    """Receive one JSON message, decoding binary frames without a str round-trip"""
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000), message.get("reason"))
+    
+    # Binary frames are parsed from bytes directly; text frames are still accepted
+    raw = message.get("bytes")
+    return orjson.loads(raw if raw is not None else message["text"])
+
 @router.websocket("/ws")
 async def websocket_general_endpoint(websocket: WebSocket):
     """General WebSocket endpoint for system updates"""
@@ -91,8 +171,7 @@ async def websocket_general_endpoint(websocket: WebSocket):
     try:
         while True:
             # Keep connection alive and handle any incoming messages
-            data = await websocket.receive_text()
-            message = json.loads(data)
+            message = await _receive_json(websocket)
             
             if message.get("type") == "ping":
                 await manager.send_personal_message({"type": "pong"}, websocket)
@@ -130,8 +209,7 @@ async def websocket_job_endpoint(websocket: WebSocket, job_id: str):
         
         while True:
             # Keep connection alive and handle any incoming messages
-            data = await websocket.receive_text()
-            message = json.loads(data)
+            message = await _receive_json(websocket)
             
             if message.get("type") == "ping":
                 await manager.send_personal_message({"type": "pong"}, websocket)
@@ -170,7 +248,7 @@ async def notify_job_progress(job_id: str, status: str, progress: int, stage: st
         "timestamp": asyncio.get_event_loop().time()
     }
     
-    await manager.send_job_update(job_id, message)
+    manager.queue_job_update(job_id, message)
 
 # Function to be called when job is completed
 async def notify_job_completion(job_id: str, total_buildings: int, execution_time: float):
@@ -183,6 +261,8 @@ async def notify_job_completion(job_id: str, total_buildings: int, execution_tim
         "timestamp": asyncio.get_event_loop().time()
     }
     
+    # Deliver any pending progress before the final message
+    await manager.flush_job_update(job_id)
     await manager.send_job_update(job_id, message)
 
 # Function to be called when job fails
@@ -195,6 +275,8 @@ async def notify_job_failure(job_id: str, error_message: str):
         "timestamp": asyncio.get_event_loop().time()
     }
     
+    # Deliver any pending progress before the final message
+    await manager.flush_job_update(job_id)
     await manager.send_job_update(job_id, message)
 
 # Export the manager for use in other modules
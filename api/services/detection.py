@@ -1,16 +1,96 @@
 """Detection service for building detection processing"""
 
 import os
-import json
+import mmap
+import orjson
 import tempfile
 import shutil
 import time
-from typing import Dict, Any, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Any, List, Optional
 from .job_manager import job_manager
-from src.utils.geojson_utils import load_geojson
+from ..config import get_settings
+from src.utils.geojson_utils import extract_polygon
+from src.core.polygon_detection import (
+    _initialize_detection_session, _load_and_prepare_data, _handle_resume_logic,
+    _execute_tile_processing, _process_merging_phase, _process_no_merging_phase,
+    _create_results_payload, _generate_visualization, _save_output_files, _finalize_session
+)
 from ..utils.logging import get_logger, log_performance, set_request_id
 
 
+logger = get_logger(__name__)
+
+SHM_DIR = "/dev/shm"
+
+# Finished workspaces are renamed into this directory (under the temp root) and deleted later
+TRASH_DIR_NAME = "async_detection_trash"
+
+# How often the sweeper empties the trash, and how long entries sit there first (seconds)
+TRASH_SWEEP_INTERVAL = 30
+TRASH_MIN_AGE = 5
+
+# Deletes workspaces that cannot be renamed into the trash (e.g. another filesystem)
+_cleanup_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cleanup")
+
+_trash_sweeper: Optional[threading.Thread] = None
+_trash_sweeper_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def get_temp_root() -> Optional[str]:
+    """Directory for job workspaces: memory-backed /dev/shm if enabled and available"""
+    if get_settings().temp_use_shm and os.path.isdir(SHM_DIR) and os.access(SHM_DIR, os.W_OK):
+        return SHM_DIR
+    return None  # tempfile's default location
+
+
+@lru_cache(maxsize=1)
+def get_trash_dir() -> str:
+    """Trash directory next to the job workspaces, so moving a workspace there is a rename"""
+    trash_dir = os.path.join(get_temp_root() or tempfile.gettempdir(), TRASH_DIR_NAME)
+    os.makedirs(trash_dir, exist_ok=True)
+    return trash_dir
+
+
+def _sweep_trash(trash_dir: str):
+    """Delete trash entries old enough that nothing is still writing to them"""
+    cutoff = time.time() - TRASH_MIN_AGE
+    with os.scandir(trash_dir) as entries:
+        for entry in entries:
+            try:
+                # A rename updates ctime, so this is the time the entry was trashed
+                if entry.stat(follow_symlinks=False).st_ctime < cutoff:
+                    shutil.rmtree(entry.path)
+            except OSError as e:
+                logger.warning(f"Could not delete trashed directory {entry.path}: {e}")
+
+
+def _trash_sweep_loop(trash_dir: str):
+    """Empty the trash directory periodically for the life of the process"""
+    while True:
+        try:
+            _sweep_trash(trash_dir)
+        except Exception as e:
+            logger.warning(f"Trash sweep failed: {e}")
+        time.sleep(TRASH_SWEEP_INTERVAL)
+
+
+def _ensure_trash_sweeper(trash_dir: str):
+    """Start the background sweeper thread on first use"""
+    global _trash_sweeper
+    if _trash_sweeper is not None:
+        return
+    with _trash_sweeper_lock:
+        if _trash_sweeper is None:
+            _trash_sweeper = threading.Thread(
+                target=_trash_sweep_loop, args=(trash_dir,), name="trash-sweeper", daemon=True
+            )
+            _trash_sweeper.start()
+
+
 class DetectionService:
     """Service for detection processing logic"""
     
@@ -20,7 +100,6 @@ class DetectionService:
         """
         Real building detection processing using YOLOv8
         """
-        logger = get_logger(__name__)
         set_request_id(job_id)
         
         job = job_manager.get_job(job_id)
@@ -35,19 +114,14 @@ class DetectionService:
             job_manager.update_job_progress(job_id, 1, "Initializing detection process", 0)
             
             # Create temporary directory for this job
-            temp_dir = tempfile.mkdtemp(prefix=f"async_detection_{job_id}_")
+            temp_dir = DetectionService.create_temp_dir(f"async_detection_{job_id}_")
             job_manager.update_job_progress(job_id, 3, "Created temporary workspace", 0)
             
-            # Create temporary GeoJSON file
-            geojson_path = os.path.join(temp_dir, "input_polygon.geojson")
-            with open(geojson_path, 'w') as f:
-                json.dump(job.polygon, f, indent=2)
-            
-            job_manager.update_job_progress(job_id, 5, "Prepared input files", 0)
+            job_manager.update_job_progress(job_id, 5, "Parsing input polygon", 0)
             
-            # Validate GeoJSON
+            # Parse the input polygon once; detection and export reuse it
             try:
-                test_load = load_geojson(geojson_path)
+                target_polygon = extract_polygon(job.polygon.model_dump(exclude_none=True))
             except Exception as e:
                 job_manager.fail_job(job_id, f"Invalid GeoJSON format: {str(e)}")
                 return
@@ -64,7 +138,7 @@ class DetectionService:
             # Run building detection with progress tracking
             detection_result = DetectionService.detect_buildings_with_progress(
                 model=model,
-                geojson_path=geojson_path,
+                geojson_path=None,
                 output_dir=output_dir,
                 zoom=params.get('zoom', 18),
                 conf=params.get('confidence', 0.25),
@@ -74,23 +148,12 @@ class DetectionService:
                 merge_touch_enabled=params.get('merge_touch_enabled', True),
                 merge_min_edge_distance_deg=params.get('merge_min_edge_distance_deg', 0.00001),
                 resume_from_saved=False,  # Don't use resume for async jobs
-                job_id=job_id  # Pass job_id for progress tracking
+                job_id=job_id,  # Pass job_id for progress tracking
+                target_polygon=target_polygon
             )
             
             # Read buildings_simple.json if it exists
-            buildings_simple_path = os.path.join(output_dir, "buildings_simple.json")
-            buildings_data = []
-            
-            if os.path.exists(buildings_simple_path):
-                with open(buildings_simple_path, 'r') as f:
-                    buildings_simple = json.load(f)
-                    # Handle both list format and dict format
-                    if isinstance(buildings_simple, list):
-                        buildings_data = buildings_simple
-                    elif isinstance(buildings_simple, dict):
-                        buildings_data = buildings_simple.get('buildings', [])
-                    else:
-                        buildings_data = []
+            buildings_data = DetectionService.read_buildings_simple(output_dir)
             
             job_manager.update_job_progress(job_id, 96, "Finalizing results", len(buildings_data))
             
@@ -109,47 +172,37 @@ class DetectionService:
             
             job_manager.complete_job(job_id, result_data)
             
-            print(f"✅ Job {job_id} completed successfully with {len(buildings_data)} buildings")
+            logger.info(f"✅ Job {job_id} completed successfully with {len(buildings_data)} buildings")
             
         except Exception as e:
             job_manager.fail_job(job_id, f"Detection processing failed: {str(e)}")
-            print(f"❌ Job {job_id} failed: {str(e)}")
+            logger.error(f"❌ Job {job_id} failed: {str(e)}")
             
         finally:
-            # Clean up temporary directory
-            if temp_dir and os.path.exists(temp_dir):
-                try:
-                    shutil.rmtree(temp_dir)
-                    print(f"🗑️ Cleaned up temp directory for job {job_id}")
-                except Exception as cleanup_error:
-                    print(f"⚠️ Warning: Failed to cleanup temp directory for job {job_id}: {cleanup_error}")
+            # Clean up temporary directory without holding up this worker thread
+            if temp_dir:
+                DetectionService.discard_temp_dir(temp_dir)
     
     @staticmethod
     def detect_buildings_with_progress(model, geojson_path, output_dir, zoom=18, conf=0.25, batch_size=5,
                                       enable_merging=True, merge_iou_threshold=0.1, merge_touch_enabled=True, 
-                                      merge_min_edge_distance_deg=0.00001, resume_from_saved=False, job_id=None):
+                                      merge_min_edge_distance_deg=0.00001, resume_from_saved=False, job_id=None,
+                                      target_polygon=None):
         """
         Wrapper around detect_buildings_in_polygon that provides progress tracking for async jobs
-        """
-        logger = get_logger(__name__)
         
+        Pass an already parsed `target_polygon` to skip reading `geojson_path`.
+        """
         if job_id:
             logger.info(f"Starting tile-based detection for job {job_id}")
             job_manager.update_job_progress(job_id, 12, "Calculating tile grid", 0)
         
-        # Import the detection function here to avoid circular imports
-        from src.core.polygon_detection import (
-            _initialize_detection_session, _load_and_prepare_data, _handle_resume_logic,
-            _execute_tile_processing, _process_merging_phase, _process_no_merging_phase,
-            _create_results_payload, _generate_visualization, _save_output_files, _finalize_session
-        )
-        
         try:
             # Initialize session
             start_time = _initialize_detection_session(output_dir)
             
             # Load and prepare data
-            tiles = _load_and_prepare_data(geojson_path, zoom)
+            tiles = _load_and_prepare_data(geojson_path, zoom, polygon=target_polygon)
             
             if job_id:
                 logger.info(f"Job {job_id}: Processing {len(tiles)} tiles at zoom level {zoom}")
@@ -162,12 +215,18 @@ class DetectionService:
                 logger.info(f"Job {job_id}: Will process {len(tiles_to_process)} tiles (resume enabled: {resume_from_saved})")
                 job_manager.update_job_progress(job_id, 20, f"Running AI inference on {len(tiles_to_process)} tiles", 0)
             
+            # Running count of raw detections, starting from any resumed tiles
+            buildings_detected = sum(len(tile_data['boxes']) for tile_data in all_detections_raw_per_tile)
+            
+            def tile_done_callback(box_count):
+                nonlocal buildings_detected
+                buildings_detected += box_count
+            
             # Define progress callback for dynamic updates
             def tile_progress_callback(completed_batches, total_batches, total_tiles_processed):
                 if job_id:
                     batch_progress = completed_batches / max(total_batches, 1)
                     progress = 20 + int(60 * batch_progress)  # Progress from 20% to 80%
-                    buildings_detected = sum(len(tile_data.get('boxes', [])) for tile_data in all_detections_raw_per_tile)
                     job_manager.update_job_progress(
                         job_id, 
                         min(progress, 80), 
@@ -177,17 +236,16 @@ class DetectionService:
             
             # Execute tile processing with progress tracking
             all_detections_raw_per_tile = _execute_tile_processing(
-                tiles_to_process, batch_size, model, conf, output_dir, all_detections_raw_per_tile, tile_progress_callback
+                tiles_to_process, batch_size, model, conf, output_dir, all_detections_raw_per_tile, tile_progress_callback,
+                tile_done_callback
             )
             
             # Tile processing progress updates are now handled by the callback above
             
             if job_id:
-                # Count total buildings found so far
-                total_buildings_so_far = sum(len(tile_data.get('boxes', [])) for tile_data in all_detections_raw_per_tile)
-                logger.info(f"Job {job_id}: Starting post-processing with {total_buildings_so_far} raw detections")
+                logger.info(f"Job {job_id}: Starting post-processing with {buildings_detected} raw detections")
                 merge_action = "Merging overlapping buildings" if enable_merging else "Converting coordinates"
-                job_manager.update_job_progress(job_id, 82, merge_action, total_buildings_so_far)
+                job_manager.update_job_progress(job_id, 82, merge_action, buildings_detected)
             
             # Process results based on merging setting
             if enable_merging:
@@ -211,12 +269,13 @@ class DetectionService:
                 job_manager.update_job_progress(job_id, 92, "Finalizing results", total_buildings_final)
             
             # Skip visualization for background jobs to avoid GUI thread issues
-            if not job_id:
+            if not job_id and geojson_path:
                 # Generate visualization only for sync processing
                 _generate_visualization(geojson_path, output_dir, total_buildings_final, tiles, zoom, conf, final_merged_shapely_objects, all_detections_raw_per_tile)
             
             # Save output files
-            results_path = _save_output_files(output_dir, json_results_payload, geojson_path)
+            results_path = _save_output_files(output_dir, json_results_payload, geojson_path,
+                                              target_polygon=target_polygon)
             
             # Finalize session
             _finalize_session(output_dir, results_path, total_buildings_final, json_results_payload['execution_time'])
@@ -228,14 +287,56 @@ class DetectionService:
                 job_manager.fail_job(job_id, f"Detection processing failed: {str(e)}")
             raise
     
+    @staticmethod
+    def read_buildings_simple(output_dir: str) -> List[Dict[str, Any]]:
+        """Read the buildings list from buildings_simple.json, if it was written"""
+        buildings_simple_path = os.path.join(output_dir, "buildings_simple.json")
+        if not os.path.exists(buildings_simple_path) or os.path.getsize(buildings_simple_path) == 0:
+            return []
+        
+        # Decode straight from the page cache: mapping the file avoids copying it into a bytes object
+        with open(buildings_simple_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    buildings_simple = orjson.loads(view)
+        
+        # Handle both list format and dict format
+        if isinstance(buildings_simple, list):
+            return buildings_simple
+        if isinstance(buildings_simple, dict):
+            return buildings_simple.get('buildings', [])
+        return []
+    
+    @staticmethod
+    def create_temp_dir(prefix: str) -> str:
+        """Create a temporary workspace directory under the configured temp root"""
+        return tempfile.mkdtemp(prefix=prefix, dir=get_temp_root())
+    
+    @staticmethod
+    def discard_temp_dir(temp_dir: str):
+        """Hand a workspace over for deletion without waiting for it to be deleted
+        
+        The directory is renamed into the trash (a metadata-only operation) and
+        removed later by the sweeper thread. If the rename fails, it is deleted
+        on the cleanup executor instead.
+        """
+        try:
+            trash_dir = get_trash_dir()
+            os.rename(temp_dir, os.path.join(trash_dir, os.path.basename(temp_dir)))
+        except OSError:
+            _cleanup_executor.submit(DetectionService.cleanup_temp_files, temp_dir)
+            return
+        _ensure_trash_sweeper(trash_dir)
+    
     @staticmethod
     def cleanup_temp_files(temp_dir: str):
         """Clean up temporary files and directory"""
         try:
             if os.path.exists(temp_dir):
                 shutil.rmtree(temp_dir)
+                logger.info(f"🗑️ Cleaned up temp directory {temp_dir}")
         except Exception as e:
-            print(f"Warning: Could not clean up temp directory {temp_dir}: {e}")
+            logger.warning(f"Could not clean up temp directory {temp_dir}: {e}")
 
 
 # Global detection service instance
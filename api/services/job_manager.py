@@ -1,19 +1,74 @@
 """Job management service for handling job lifecycle and storage"""
 
 import time
+import heapq
+import asyncio
 import threading
-from typing import Dict, Any, Optional, List
-from api.models import JobInfo, JobStatus
+from itertools import dropwhile
+from typing import Dict, Any, Optional, List, Tuple
+from api.models import JobInfo, JobStatus, GeoJSONInput
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Number of independently locked partitions of the job table
+JOB_SHARD_COUNT = 16
+
+# Most distinct (cursor, limit) job list pages kept for the current state version
+JOB_PAGE_CACHE_SIZE = 64
+
+# Progress updates that move less than PROGRESS_MIN_STEP percent within the same
+# stage are dropped when they arrive within PROGRESS_UPDATE_INTERVAL seconds
+PROGRESS_UPDATE_INTERVAL = 0.2
+PROGRESS_MIN_STEP = 1
+
+
+def _stage_key(stage: str) -> str:
+    """Stage name without its running counters ("AI inference: 3/9 batches" -> "AI inference")"""
+    return stage.partition(":")[0]
+
+
+class _JobShard:
+    """One partition of the job table with its own lock"""
+    
+    __slots__ = ("jobs", "lock", "version")
+    
+    def __init__(self):
+        self.jobs: Dict[str, JobInfo] = {}
+        self.lock = threading.Lock()
+        # Bumped on every state change of a job in this shard
+        self.version = 0
 
 
 class JobManager:
-    """Centralized job management service"""
+    """Centralized job management service
+    
+    Jobs are spread over shards so that writers for different jobs do not
+    contend on one lock. Single-job reads (`get_job`) are lock-free: a dict
+    lookup is atomic under the GIL and job fields are plain attributes.
+    """
     
     def __init__(self):
-        self.active_jobs: Dict[str, JobInfo] = {}
-        self.job_lock = threading.Lock()
+        self._shards = [_JobShard() for _ in range(JOB_SHARD_COUNT)]
+        # Job IDs in submission order mapped to their submission sequence number,
+        # for newest-first listing; the sequence number is the page cursor
+        self._job_order: Dict[str, int] = {}
+        self._next_sequence = 0
+        self._order_lock = threading.Lock()
+        # Job list pages built at `_page_cache_version`, keyed by (cursor, limit)
+        self._page_cache: Dict[Tuple[Optional[int], Optional[int]], Tuple[List[Dict[str, Any]], Optional[int]]] = {}
+        self._page_cache_version = -1
+        # Background task running each job, kept out of request_params
+        self._tasks: Dict[str, asyncio.Task] = {}
+        # (monotonic finish time, job ID) of finished jobs, oldest first, for cleanup
+        self._finished_heap: List[Tuple[float, str]] = []
+        self._heap_lock = threading.Lock()
+    
+    def _shard(self, job_id: str) -> _JobShard:
+        """Get the shard that owns a job ID"""
+        return self._shards[hash(job_id) % JOB_SHARD_COUNT]
     
-    def create_job(self, job_id: str, polygon: Dict[str, Any], request_params: Dict[str, Any]) -> JobInfo:
+    def create_job(self, job_id: str, polygon: GeoJSONInput, request_params: Dict[str, Any]) -> JobInfo:
         """Create a new job with initial status"""
         job_info = JobInfo(
             job_id=job_id,
@@ -25,102 +80,229 @@ class JobManager:
             polygon=polygon,
             request_params=request_params
         )
+        job_info._started_monotonic = time.monotonic()
         
-        with self.job_lock:
-            self.active_jobs[job_id] = job_info
+        shard = self._shard(job_id)
+        with shard.lock:
+            shard.jobs[job_id] = job_info
+            shard.version += 1
         
-        print(f"📝 Created job {job_id} - Status: {job_info.status}")
+        with self._order_lock:
+            self._job_order[job_id] = self._next_sequence
+            self._next_sequence += 1
+        
+        logger.info(f"📝 Created job {job_id} - Status: {job_info.status}")
         return job_info
     
     def get_job(self, job_id: str) -> Optional[JobInfo]:
         """Get job information by ID"""
-        with self.job_lock:
-            return self.active_jobs.get(job_id)
+        return self._shard(job_id).jobs.get(job_id)
+    
+    def _mark_finished(self, job: JobInfo):
+        """Record the wall-clock end time and the monotonic execution time
+        
+        Only the first transition to a terminal state counts (a cancelled job's
+        worker may still complete or fail it later), so each job is pushed onto
+        the cleanup heap once.
+        """
+        if job._finished_monotonic is not None:
+            return
+        
+        job.end_time = time.time()
+        job._finished_monotonic = time.monotonic()
+        job.execution_time = job._finished_monotonic - job._started_monotonic
+        
+        with self._heap_lock:
+            heapq.heappush(self._finished_heap, (job._finished_monotonic, job.job_id))
+    
+    def set_job_task(self, job_id: str, task: asyncio.Task):
+        """Remember the background task running a job"""
+        self._tasks[job_id] = task
+    
+    def discard_job_task(self, job_id: str):
+        """Forget a job's background task once it has finished"""
+        self._tasks.pop(job_id, None)
     
     def update_job_progress(self, job_id: str, progress: int, stage: str, buildings_found: int = 0):
         """Update job progress and stage"""
-        with self.job_lock:
-            if job_id in self.active_jobs:
-                job = self.active_jobs[job_id]
+        now = time.monotonic()
+        
+        # Drop small steps within the same stage without taking the lock
+        job = self.get_job(job_id)
+        if (job is not None and job.status == JobStatus.PROCESSING
+                and abs(progress - job.progress) < PROGRESS_MIN_STEP
+                and _stage_key(stage) == _stage_key(job.stage)
+                and now - job._last_progress_at < PROGRESS_UPDATE_INTERVAL):
+            return
+        
+        shard = self._shard(job_id)
+        with shard.lock:
+            job = shard.jobs.get(job_id)
+            if job is not None:
                 job.progress = progress
                 job.stage = stage
                 job.buildings_found = buildings_found
                 job.status = JobStatus.PROCESSING
-                print(f"📊 Job {job_id}: {progress}% - {stage} - Buildings: {buildings_found}")
+                job._last_progress_at = now
+                shard.version += 1
+                logger.debug(f"📊 Job {job_id}: {progress}% - {stage} - Buildings: {buildings_found}")
     
     def complete_job(self, job_id: str, result_data: Dict[str, Any]):
         """Mark job as completed with results"""
-        with self.job_lock:
-            if job_id in self.active_jobs:
-                job = self.active_jobs[job_id]
+        shard = self._shard(job_id)
+        with shard.lock:
+            job = shard.jobs.get(job_id)
+            if job is not None:
                 job.status = JobStatus.COMPLETED
                 job.progress = 100
                 job.stage = "Completed successfully"
-                job.end_time = time.time()
-                job.execution_time = job.end_time - job.start_time
+                self._mark_finished(job)
                 
-                # Store result data in job
-                job.request_params['result_data'] = result_data
+                job.result_data = result_data
+                # The input geometry is not needed after processing
+                job.polygon = None
+                shard.version += 1
                 
-                print(f"✅ Job {job_id} completed in {job.execution_time:.2f} seconds")
+                logger.info(f"✅ Job {job_id} completed in {job.execution_time:.2f} seconds")
     
     def fail_job(self, job_id: str, error_message: str):
         """Mark job as failed with error message"""
-        with self.job_lock:
-            if job_id in self.active_jobs:
-                job = self.active_jobs[job_id]
+        shard = self._shard(job_id)
+        with shard.lock:
+            job = shard.jobs.get(job_id)
+            if job is not None:
                 job.status = JobStatus.FAILED
                 job.error_message = error_message
-                job.end_time = time.time()
-                job.execution_time = job.end_time - job.start_time
+                self._mark_finished(job)
+                job.polygon = None
+                shard.version += 1
                 
-                print(f"❌ Job {job_id} failed: {error_message}")
+                logger.warning(f"❌ Job {job_id} failed: {error_message}")
     
     def cancel_job(self, job_id: str):
         """Cancel a job"""
-        with self.job_lock:
-            if job_id in self.active_jobs:
-                job = self.active_jobs[job_id]
+        shard = self._shard(job_id)
+        with shard.lock:
+            job = shard.jobs.get(job_id)
+            if job is not None:
                 job.status = JobStatus.CANCELLED
                 job.stage = "Job cancelled by user"
-                job.end_time = time.time()
-                job.execution_time = job.end_time - job.start_time
+                self._mark_finished(job)
                 job.error_message = "Job was cancelled by user request"
+                shard.version += 1
+                
+                # Stop the job if it is still waiting for a free slot
+                task = self._tasks.pop(job_id, None)
+                if task is not None:
+                    task.get_loop().call_soon_threadsafe(task.cancel)
                 
-                print(f"🚫 Job {job_id} cancelled by user")
+                logger.info(f"🚫 Job {job_id} cancelled by user")
     
-    def cleanup_old_jobs(self, max_age_hours: int = 1):
+    def cleanup_old_jobs(self, max_age_hours: float = 1):
         """Clean up jobs older than specified hours"""
-        current_time = time.time()
-        max_age_seconds = max_age_hours * 3600
-        
-        with self.job_lock:
-            jobs_to_remove = []
-            for job_id, job in self.active_jobs.items():
-                if job.end_time and (current_time - job.end_time) > max_age_seconds:
-                    jobs_to_remove.append(job_id)
+        cutoff = time.monotonic() - max_age_hours * 3600
+        
+        # Finished jobs come off the heap oldest first; stop at the first young one
+        expired = []
+        with self._heap_lock:
+            while self._finished_heap and self._finished_heap[0][0] < cutoff:
+                expired.append(heapq.heappop(self._finished_heap))
+        
+        removed_job_ids = []
+        for finished_at, job_id in expired:
+            shard = self._shard(job_id)
+            with shard.lock:
+                job = shard.jobs.get(job_id)
+                # Skip entries for jobs already removed or finished again since
+                if job is None or job._finished_monotonic != finished_at:
+                    continue
+                
+                del shard.jobs[job_id]
+                shard.version += 1
             
-            for job_id in jobs_to_remove:
-                del self.active_jobs[job_id]
-                print(f"🗑️ Cleaned up old job: {job_id}")
+            self._tasks.pop(job_id, None)
+            removed_job_ids.append(job_id)
+            logger.info(f"🗑️ Cleaned up old job: {job_id}")
+        
+        if removed_job_ids:
+            with self._order_lock:
+                for job_id in removed_job_ids:
+                    self._job_order.pop(job_id, None)
+    
+    async def run_periodic_cleanup(self, interval_hours: float):
+        """Remove jobs finished more than `interval_hours` ago, every `interval_hours`"""
+        while True:
+            await asyncio.sleep(interval_hours * 3600)
+            try:
+                self.cleanup_old_jobs(max_age_hours=interval_hours)
+            except Exception as e:
+                logger.error(f"❌ Job cleanup failed: {e}")
+    
+    def get_job_count(self) -> int:
+        """Get the number of jobs currently held"""
+        return sum(len(shard.jobs) for shard in self._shards)
     
     def get_active_job_count(self) -> int:
         """Get count of currently processing jobs"""
-        with self.job_lock:
-            return len([job for job in self.active_jobs.values() 
-                       if job.status in [JobStatus.QUEUED, JobStatus.PROCESSING]])
+        count = 0
+        for shard in self._shards:
+            with shard.lock:
+                count += sum(1 for job in shard.jobs.values()
+                             if job.status in (JobStatus.QUEUED, JobStatus.PROCESSING))
+        return count
     
     def is_job_id_available(self, job_id: str) -> bool:
         """Check if job ID is not already in use"""
-        with self.job_lock:
-            return job_id not in self.active_jobs
+        return job_id not in self._shard(job_id).jobs
+    
+    def get_version(self) -> int:
+        """Get the current job state version (only ever increases)"""
+        return sum(shard.version for shard in self._shards)
     
     def get_all_jobs(self) -> List[Dict[str, Any]]:
         """Get summary of all jobs"""
+        return self.get_jobs_page()[1]
+    
+    def get_jobs_page(self, cursor: Optional[int] = None,
+                      limit: Optional[int] = None) -> Tuple[int, List[Dict[str, Any]], Optional[int]]:
+        """Get the state version, a page of job summaries (newest first) and the next cursor
+        
+        Jobs are recorded in submission order, so the page is read by walking
+        that order backwards. Cursors are submission sequence numbers: the page
+        starts below `cursor`, so it keeps working after the job it came from
+        is cleaned up. The next cursor is None when there is no further page.
+        The version is read first, so it never claims newer state than returned.
+        Pages are cached until any job changes, so repeated polls of an idle
+        system reuse the same list; callers must not modify it.
+        """
+        version = self.get_version()
+        cache_key = (cursor, limit)
         jobs_summary = []
         
-        with self.job_lock:
-            for job_id, job in self.active_jobs.items():
+        with self._order_lock:
+            if self._page_cache_version == version:
+                cached = self._page_cache.get(cache_key)
+                if cached is not None:
+                    return version, *cached
+            else:
+                self._page_cache.clear()
+                self._page_cache_version = version
+            
+            jobs = reversed(self._job_order.items())
+            if cursor is not None:
+                # Skip jobs submitted at or after the cursor
+                jobs = dropwhile(lambda item: item[1] >= cursor, jobs)
+            
+            next_cursor = None
+            last_sequence = None
+            for job_id, sequence in jobs:
+                job = self.get_job(job_id)
+                if job is None:
+                    continue
+                if limit is not None and len(jobs_summary) >= limit:
+                    # Another job exists past the full page
+                    next_cursor = last_sequence
+                    break
                 jobs_summary.append({
                     "job_id": job_id,
                     "status": job.status,
@@ -130,41 +312,33 @@ class JobManager:
                     "start_time": job.start_time,
                     "execution_time": job.execution_time
                 })
+                last_sequence = sequence
+            
+            if len(self._page_cache) >= JOB_PAGE_CACHE_SIZE:
+                self._page_cache.clear()
+            self._page_cache[cache_key] = (jobs_summary, next_cursor)
         
-        # Sort by start time (newest first)
-        jobs_summary.sort(key=lambda x: x["start_time"], reverse=True)
-        return jobs_summary
+        return version, jobs_summary, next_cursor
     
     def get_job_statistics(self) -> Dict[str, int]:
         """Get comprehensive job statistics"""
-        with self.job_lock:
-            stats = {
-                "total": len(self.active_jobs),
-                "queued": 0,
-                "processing": 0,
-                "completed": 0,
-                "failed": 0,
-                "cancelled": 0
-            }
-            
-            for job in self.active_jobs.values():
-                if job.status == JobStatus.QUEUED:
-                    stats["queued"] += 1
-                elif job.status == JobStatus.PROCESSING:
-                    stats["processing"] += 1
-                elif job.status == JobStatus.COMPLETED:
-                    stats["completed"] += 1
-                elif job.status == JobStatus.FAILED:
-                    stats["failed"] += 1
-                elif job.status == JobStatus.CANCELLED:
-                    stats["cancelled"] += 1
-            
-            return stats
+        stats = {
+            "total": 0,
+            "queued": 0,
+            "processing": 0,
+            "completed": 0,
+            "failed": 0,
+            "cancelled": 0
+        }
+        
+        for shard in self._shards:
+            with shard.lock:
+                stats["total"] += len(shard.jobs)
+                for job in shard.jobs.values():
+                    stats[job.status.value] += 1
+        
+        return stats
 
 
 # Global job manager instance
 job_manager = JobManager()
-
-# For compatibility - update references in the job manager
-job_manager.jobs = job_manager.active_jobs  # Alias for backward compatibility
-job_manager.lock = job_manager.job_lock  # Alias for backward compatibility 
\ No newline at end of file
@@ -1,17 +1,35 @@
 """Validation service for job IDs and other validation logic"""
 
-import uuid
-from typing import Optional
+import re
+from typing import Dict, Any, Optional
 from fastapi import HTTPException
+from src.utils.geojson_utils import extract_polygon
 from ..config import get_settings
+from ..utils.ids import uuid4_hex
 from .job_manager import job_manager
 
 
+def _compile_job_id_pattern(min_length: int, max_length: int) -> "re.Pattern[str]":
+    """Build the job ID pattern: alphanumerics, hyphens and underscores,
+    starting and ending alphanumeric, with the configured length limits"""
+    inner_min = max(min_length - 2, 0)
+    inner_max = max(max_length - 2, inner_min)
+    pattern = rf'[A-Za-z0-9](?:[A-Za-z0-9_-]{{{inner_min},{inner_max}}}[A-Za-z0-9])'
+    # A single character is only valid when the minimum length allows it
+    if min_length <= 1:
+        pattern += '?'
+    return re.compile(pattern)
+
+
 class ValidationService:
     """Service for validation logic"""
     
     def __init__(self):
         self.settings = get_settings()
+        # Plain ints read once instead of on every request
+        self._min_len = self.settings.job_id_min_length
+        self._max_len = self.settings.job_id_max_length
+        self._job_id_re = _compile_job_id_pattern(self._min_len, self._max_len)
     
     def validate_job_id_format(self, job_id: str) -> bool:
         """
@@ -20,25 +38,7 @@ class ValidationService:
         Returns:
             bool: True if valid, False otherwise
         """
-        if not job_id:
-            return False
-        
-        if len(job_id) < self.settings.job_id_min_length:
-            return False
-        
-        if len(job_id) > self.settings.job_id_max_length:
-            return False
-        
-        # Check first and last characters
-        if not (job_id[0].isalnum() and job_id[-1].isalnum()):
-            return False
-        
-        # Check all characters
-        for char in job_id:
-            if not (char.isalnum() or char in ['-', '_']):
-                return False
-        
-        return True
+        return bool(job_id) and self._job_id_re.fullmatch(job_id) is not None
     
     def validate_and_get_job_id(self, requested_job_id: Optional[str]) -> str:
         """
@@ -52,13 +52,13 @@ class ValidationService:
         """
         if requested_job_id is None:
             # Auto-generate UUID if no custom job_id provided
-            return str(uuid.uuid4())
+            return uuid4_hex()
         
         # Validate custom job_id format
         if not self.validate_job_id_format(requested_job_id):
             raise HTTPException(
                 status_code=400,
-                detail=f"Invalid job_id format. Must be {self.settings.job_id_min_length}-{self.settings.job_id_max_length} characters, alphanumeric with hyphens/underscores, cannot start/end with special characters. Got: '{requested_job_id}'"
+                detail=f"Invalid job_id format. Must be {self._min_len}-{self._max_len} characters, alphanumeric with hyphens/underscores, cannot start/end with special characters. Got: '{requested_job_id}'"
             )
         
         # Check if job_id is already in use
@@ -70,6 +70,43 @@ class ValidationService:
         
         return requested_job_id
     
+    def validate_batch_size(self, batch_size: Optional[int]):
+        """
+        Validate the tile batch size against the TensorRT engine limit
+        
+        The engine is exported with a fixed maximum batch, so larger batches
+        would fail inside the detection pipeline.
+        
+        Raises:
+            HTTPException: If TensorRT is enabled and batch_size exceeds the engine limit
+        """
+        if not self.settings.use_tensorrt or batch_size is None:
+            return
+        max_batch_size = self.settings.tensorrt_max_batch_size
+        if batch_size > max_batch_size:
+            raise HTTPException(
+                status_code=400,
+                detail=f"batch_size {batch_size} exceeds the TensorRT engine limit of {max_batch_size}. Use a batch_size of at most {max_batch_size}."
+            )
+    
+    @staticmethod
+    def validate_geojson_polygon(polygon: Dict[str, Any]):
+        """
+        Validate that GeoJSON data contains at least one usable polygon
+        
+        Works on the already-parsed request data, no file round-trip.
+        
+        Raises:
+            HTTPException: If no valid polygon can be built from the data
+        """
+        try:
+            extract_polygon(polygon)
+        except Exception as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid GeoJSON format: {str(e)}"
+            )
+    
     @staticmethod
     def validate_job_exists(job_id: str):
         """
@@ -0,0 +1,18 @@
+"""Cheap wall-clock timestamps for API responses"""
+
+import time
+from datetime import datetime
+
+# (epoch second, ISO string) of the last formatted timestamp
+_cached_iso = (0, "")
+
+
+def iso_now() -> str:
+    """Current local time as an ISO string, formatted at most once per second"""
+    global _cached_iso
+    second = int(time.time())
+    cached_second, cached_value = _cached_iso
+    if second != cached_second:
+        cached_value = datetime.fromtimestamp(second).isoformat()
+        _cached_iso = (second, cached_value)
+    return cached_value
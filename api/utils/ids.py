@@ -0,0 +1,48 @@
+"""Random ID generation with batched entropy reads"""
+
+import os
+import uuid
+import threading
+
+# UUIDs generated per os.urandom call
+UUID_BATCH_SIZE = 1024
+
+
+class UUIDPool:
+    """Hands out random (version 4) UUIDs from one large os.urandom read"""
+    
+    def __init__(self, batch_size: int = UUID_BATCH_SIZE):
+        self._batch_size = batch_size
+        self._lock = threading.Lock()
+        self._refill()
+    
+    def _refill(self):
+        """Read a fresh batch of random bytes"""
+        self._buffer = os.urandom(16 * self._batch_size)
+        self._offset = 0
+    
+    def reset(self):
+        """Drop buffered randomness (a forked child must not reuse the parent's)"""
+        with self._lock:
+            self._refill()
+    
+    def next(self) -> uuid.UUID:
+        """Get the next UUID"""
+        with self._lock:
+            if self._offset == len(self._buffer):
+                self._refill()
+            raw = self._buffer[self._offset:self._offset + 16]
+            self._offset += 16
+        # version=4 sets the version and variant bits
+        return uuid.UUID(bytes=raw, version=4)
+
+
+_uuid_pool = UUIDPool()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_uuid_pool.reset)
+
+
+def uuid4_hex() -> str:
+    """Random UUID as 32 hex digits without hyphens, equivalent to uuid.uuid4().hex"""
+    return _uuid_pool.next().hex
@@ -19,25 +19,23 @@ class RequestIDFilter(logging.Filter):
         return True
 
 class PerformanceFormatter(logging.Formatter):
-    """Custom formatter with performance timing"""
+    """Custom formatter with request ID in every line"""
     
-    def format(self, record):
-        # Add timestamp
-        record.timestamp = time.time()
-        
-        # Standard format with request ID
-        log_format = "[%(asctime)s] %(levelname)s [%(request_id)s] %(name)s: %(message)s"
-        formatter = logging.Formatter(log_format, datefmt="%Y-%m-%d %H:%M:%S")
-        
-        return formatter.format(record)
+    # Standard format with request ID
+    LOG_FORMAT = "[%(asctime)s] %(levelname)s [%(request_id)s] %(name)s: %(message)s"
+    DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+    
+    def __init__(self):
+        super().__init__(self.LOG_FORMAT, datefmt=self.DATE_FORMAT)
 
 def setup_logging():
     """Setup centralized logging configuration"""
     settings = get_settings()
+    log_level = getattr(logging, settings.log_level.upper())
     
     # Configure root logger
     root_logger = logging.getLogger()
-    root_logger.setLevel(getattr(logging, settings.log_level.upper()))
+    root_logger.setLevel(log_level)
     
     # Remove existing handlers
     for handler in root_logger.handlers[:]:
@@ -45,7 +43,7 @@ def setup_logging():
     
     # Console handler with custom formatter
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(getattr(logging, settings.log_level.upper()))
+    console_handler.setLevel(log_level)
     console_handler.addFilter(RequestIDFilter())
     console_handler.setFormatter(PerformanceFormatter())
     
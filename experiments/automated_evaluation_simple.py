@@ -6,10 +6,12 @@ One-command solution that automatically handles spatial synchronization
 """
 
 import json
+import orjson
 import requests
 import subprocess
 import sys
 import math
+import numpy as np
 from pathlib import Path
 
 def check_sync_status():
@@ -20,30 +22,26 @@ def check_sync_status():
     
     try:
         # Load study area center
-        with open(base_dir / "examples" / "sample_polygon.geojson", 'r') as f:
-            study_area = json.load(f)
-            coords = study_area['features'][0]['geometry']['coordinates'][0]
-            study_lat = sum(coord[1] for coord in coords) / len(coords)
-            study_lon = sum(coord[0] for coord in coords) / len(coords)
+        with open(base_dir / "examples" / "sample_polygon.geojson", 'rb') as f:
+            study_area = orjson.loads(f.read())
+            coords = np.asarray(study_area['features'][0]['geometry']['coordinates'][0], dtype=np.float64)
+            study_lon, study_lat = coords[:, :2].mean(axis=0).tolist()
         
         # Load OSM buildings center
         try:
-            with open(base_dir / "output" / "osm_buildings_corrected.json", 'r') as f:
-                osm_data = json.load(f)
+            with open(base_dir / "output" / "osm_buildings_corrected.json", 'rb') as f:
+                osm_data = orjson.loads(f.read())
                 
                 if 'features' in osm_data and osm_data['features']:
-                    osm_lats, osm_lons = [], []
-                    for feature in osm_data['features']:
-                        if feature['geometry']['type'] == 'Polygon':
-                            coords = feature['geometry']['coordinates'][0]
-                            avg_lat = sum(coord[1] for coord in coords) / len(coords)
-                            avg_lon = sum(coord[0] for coord in coords) / len(coords)
-                            osm_lats.append(avg_lat)
-                            osm_lons.append(avg_lon)
+                    # Vertex average of each building's outer ring, all computed up front
+                    osm_centroids = [
+                        np.asarray(feature['geometry']['coordinates'][0], dtype=np.float64)[:, :2].mean(axis=0)
+                        for feature in osm_data['features']
+                        if feature['geometry']['type'] == 'Polygon'
+                    ]
                     
-                    if osm_lats:
-                        osm_lat = sum(osm_lats) / len(osm_lats)
-                        osm_lon = sum(osm_lons) / len(osm_lons)
+                    if osm_centroids:
+                        osm_lon, osm_lat = np.vstack(osm_centroids).mean(axis=0).tolist()
                         
                         # Calculate distance
                         lat1, lon1, lat2, lon2 = map(math.radians, [study_lat, study_lon, osm_lat, osm_lon])
@@ -70,13 +68,11 @@ def download_osm_buildings():
     
     try:
         # Get study area bounds
-        with open(base_dir / "examples" / "sample_polygon.geojson", 'r') as f:
-            study_area = json.load(f)
-            coords = study_area['features'][0]['geometry']['coordinates'][0]
-            min_lat = min(coord[1] for coord in coords)
-            max_lat = max(coord[1] for coord in coords)
-            min_lon = min(coord[0] for coord in coords)
-            max_lon = max(coord[0] for coord in coords)
+        with open(base_dir / "examples" / "sample_polygon.geojson", 'rb') as f:
+            study_area = orjson.loads(f.read())
+            coords = np.asarray(study_area['features'][0]['geometry']['coordinates'][0], dtype=np.float64)
+            min_lon, min_lat = coords[:, :2].min(axis=0).tolist()
+            max_lon, max_lat = coords[:, :2].max(axis=0).tolist()
         
         # Overpass query
         query = f"""
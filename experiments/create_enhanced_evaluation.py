@@ -11,13 +11,76 @@ then creates a color-coded visualization showing:
 Author: Building Detection Evaluation System
 """
 
-import json
+import argparse
+import gzip
+import orjson
 import folium
 import math
+import numpy as np
+from scipy.spatial import cKDTree
 from typing import List, Dict, Tuple, Set, Optional
 from dataclasses import dataclass
+from itertools import islice
 from pathlib import Path
 
+# Map popups and building labels; only the values change per building
+MATCHED_BUILDING_POPUP = "🏠 OSM Building #{number}<br>📊 Status: <b>Successfully Detected</b><br>🎯 Matched to Detection ID: {matched_id}<br>📏 Distance: {distance:.1f}m"
+MISSED_BUILDING_POPUP = "🏠 OSM Building #{number}<br>⚠️ Status: <b>MISSED by Model</b><br>❌ No nearby detection found"
+MATCHED_DETECTION_POPUP = "🎯 Model Detection ID: {detection_id}<br>📊 Status: <b>True Positive</b><br>🏠 Matched to OSM Building ID: {matched_id}<br>📏 Distance: {distance:.1f}m"
+UNMATCHED_DETECTION_POPUP = "🎯 Model Detection ID: {detection_id}<br>⚠️ Status: <b>False Positive</b><br>❌ No nearby OSM building found"
+
+# Building number label styling (permanent Leaflet tooltips), added to the page once
+BUILDING_LABEL_CSS = """
+<style>
+.leaflet-tooltip.building-label { font-size: 10px; font-weight: bold; color: white; border: none; box-shadow: none; border-radius: 50%; padding: 2px; text-align: center; min-width: 16px; height: 16px; line-height: 12px; }
+.leaflet-tooltip.building-label td { padding: 0; }
+.building-label.matched { background-color: #28a745; }
+.building-label.missed { background-color: #dc3545; }
+</style>
+"""
+
+# Mean Earth radius in meters
+EARTH_RADIUS_M = 6371000
+
+# Up to this many point pairs, nearest neighbours come from a full distance matrix
+# (cheaper than building a KD-tree for small inputs)
+MATRIX_MAX_PAIRS = 1_000
+
+# Ground truth vs model summary, filled in once per report
+SUMMARY_TEMPLATE = """
+🏠 GROUND TRUTH vs MODEL COMPARISON
+==================================================
+📊 Ground Truth (OSM Buildings): {total_ground_truth} buildings
+🎯 Model Detections: {total_detections} detections
+✅ Successfully Matched: {successfully_matched} buildings
+
+📈 ACCURACY METRICS:
+==============================
+✅ Detection Rate: {detection_rate}% ({successfully_matched}/{total_ground_truth})
+❌ Miss Rate: {miss_rate}% ({missed_buildings}/{total_ground_truth})
+🎯 Precision: {precision_pct}% ({successfully_matched}/{total_detections})
+📊 Overall Accuracy: {detection_rate}%
+
+📋 DETAILED BREAKDOWN:
+=========================
+🟢 Buildings Successfully Detected: {successfully_matched}
+🔴 Buildings Missed by Model: {missed_buildings}
+🔵 False Detections: {false_detections}
+
+💡 INTERPRETATION:
+====================
+{verdict}
+{miss_text}
+{false_detection_text}"""
+
+# (minimum detection rate, verdict) from best to worst
+SUMMARY_VERDICTS = (
+    (95, "🌟 EXCELLENT: Model achieves {detection_rate}% detection rate!"),
+    (90, "👍 GOOD: Model achieves {detection_rate}% detection rate."),
+    (80, "⚠️  FAIR: Model achieves {detection_rate}% detection rate. Consider improvement."),
+    (float('-inf'), "❌ POOR: Model only achieves {detection_rate}% detection rate. Needs significant improvement."),
+)
+
 # Simple comparison functionality
 class PercentageComparisonAnalyzer:
     """Simple analyzer for percentage-based comparison"""
@@ -36,67 +99,72 @@ class PercentageComparisonAnalyzer:
         miss_rate = (missed_buildings / total_ground_truth * 100) if total_ground_truth > 0 else 0
         precision_pct = (successfully_matched / total_detections * 100) if total_detections > 0 else 0
         
-        summary = f"""
-🏠 GROUND TRUTH vs MODEL COMPARISON
-{'='*50}
-📊 Ground Truth (OSM Buildings): {total_ground_truth} buildings
-🎯 Model Detections: {total_detections} detections
-✅ Successfully Matched: {successfully_matched} buildings
-
-📈 ACCURACY METRICS:
-{'='*30}
-✅ Detection Rate: {detection_rate:.1f}% ({successfully_matched}/{total_ground_truth})
-❌ Miss Rate: {miss_rate:.1f}% ({missed_buildings}/{total_ground_truth})
-🎯 Precision: {precision_pct:.1f}% ({successfully_matched}/{total_detections})
-📊 Overall Accuracy: {detection_rate:.1f}%
-
-📋 DETAILED BREAKDOWN:
-{'='*25}
-🟢 Buildings Successfully Detected: {successfully_matched}
-🔴 Buildings Missed by Model: {missed_buildings}
-🔵 False Detections: {false_detections}
-
-💡 INTERPRETATION:
-{'='*20}"""
-        
-        if detection_rate >= 95:
-            summary += f"\n🌟 EXCELLENT: Model achieves {detection_rate:.1f}% detection rate!"
-        elif detection_rate >= 90:
-            summary += f"\n👍 GOOD: Model achieves {detection_rate:.1f}% detection rate."
-        elif detection_rate >= 80:
-            summary += f"\n⚠️  FAIR: Model achieves {detection_rate:.1f}% detection rate. Consider improvement."
-        else:
-            summary += f"\n❌ POOR: Model only achieves {detection_rate:.1f}% detection rate. Needs significant improvement."
+        verdict = next(text for minimum, text in SUMMARY_VERDICTS if detection_rate >= minimum)
+        
+        # Format each percentage once; the detection rate appears three times in the report
+        detection_rate_text = f"{detection_rate:.1f}"
         
         if missed_buildings > 0:
-            summary += f"\n🔍 {missed_buildings} buildings were missed - check red polygons on map for analysis."
+            miss_text = f"🔍 {missed_buildings} buildings were missed - check red polygons on map for analysis."
         else:
-            summary += "\n🎯 Perfect detection - no buildings missed!"
+            miss_text = "🎯 Perfect detection - no buildings missed!"
             
         if false_detections > 0:
-            summary += f"\n⚠️  {false_detections} false detections found - model may be over-detecting."
+            false_detection_text = f"⚠️  {false_detections} false detections found - model may be over-detecting."
         else:
-            summary += "\n✅ No false detections - excellent precision!"
-        
-        return summary
+            false_detection_text = "✅ No false detections - excellent precision!"
+        
+        return SUMMARY_TEMPLATE.format(
+            total_ground_truth=total_ground_truth,
+            total_detections=total_detections,
+            successfully_matched=successfully_matched,
+            missed_buildings=missed_buildings,
+            false_detections=false_detections,
+            detection_rate=detection_rate_text,
+            miss_rate=f"{miss_rate:.1f}",
+            precision_pct=f"{precision_pct:.1f}",
+            verdict=verdict.format(detection_rate=detection_rate_text),
+            miss_text=miss_text,
+            false_detection_text=false_detection_text
+        )
 
 @dataclass
-class BuildingMatch:
-    """Represents the matching status of a building"""
-    osm_id: int
-    osm_centroid: Tuple[float, float]
-    matched_detection_id: Optional[int] = None
-    distance_to_match: Optional[float] = None
-    is_matched: bool = False
+class MatchResult:
+    """
+    Matching status of one point set (OSM buildings or model detections)
+    
+    Stored column-wise: entry i of every array describes point i.
+    """
+    ids: np.ndarray                # object array of point IDs
+    points: np.ndarray             # (N, 2) float64 (lat, lon)
+    is_matched: np.ndarray         # bool
+    matched_ids: np.ndarray        # object array of the matched point's ID, None if unmatched
+    distance_to_match: np.ndarray  # float64 meters, NaN if unmatched
+    geometries: Optional[np.ndarray] = None  # object array of GeoJSON geometries (OSM buildings only)
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def to_columns(self, id_key: str, point_key: str, matched_key: str) -> Dict:
+        """
+        Export as one list per field (for JSON output)
+        
+        Numeric columns stay NumPy arrays for orjson's OPT_SERIALIZE_NUMPY;
+        unmatched distances (NaN) are written as null.
+        """
+        return {
+            id_key: self.ids.tolist(),
+            point_key: self.points,
+            'is_matched': self.is_matched,
+            matched_key: self.matched_ids.tolist(),
+            'distance_to_match': self.distance_to_match
+        }
 
-@dataclass
-class DetectionMatch:
-    """Represents the matching status of a model detection"""
-    detection_id: int
-    detection_point: Tuple[float, float]
-    matched_osm_id: Optional[int] = None
-    distance_to_match: Optional[float] = None
-    is_matched: bool = False
+def _object_array(values: List) -> np.ndarray:
+    """Build a 1-D object array without NumPy trying to nest sequences"""
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
 
 class SpatialMatcher:
     """Handles spatial matching between model detections and OSM buildings"""
@@ -129,59 +197,76 @@ class SpatialMatcher:
         
         return earth_radius * c
     
-    def find_closest_detection(self, osm_centroid: Tuple[float, float], 
-                              detections: List[Dict]) -> Tuple[int, float]:
+    @staticmethod
+    def _project_local(points: np.ndarray, ref_lat: float) -> np.ndarray:
         """
-        Find the closest model detection to an OSM building centroid
+        Project (latitude, longitude) points in degrees onto a flat (x, y) plane in meters
         
-        Args:
-            osm_centroid: (lat, lon) of OSM building centroid
-            detections: List of model detection dictionaries
-            
-        Returns:
-            Tuple of (detection_id, distance) or (None, float('inf')) if none found
+        Equirectangular projection around `ref_lat`: over a study area a few km
+        across it differs from haversine by well under a meter, far below the
+        matching threshold, and makes all distances plain Euclidean ones.
         """
-        min_distance = float('inf')
-        closest_detection_id = None
-        
-        for detection in detections:
-            detection_point = (detection['lat'], detection['lon'])
-            distance = self.haversine_distance(osm_centroid, detection_point)
-            
-            if distance < min_distance:
-                min_distance = distance
-                closest_detection_id = detection['id']
-        
-        return closest_detection_id, min_distance
+        # Degree-to-radian conversion is folded into the two scale factors
+        ky = EARTH_RADIUS_M * math.pi / 180
+        kx = ky * math.cos(math.radians(ref_lat))
+        return points[:, ::-1] * np.array([kx, ky])
     
-    def find_closest_osm_building(self, detection_point: Tuple[float, float], 
-                                 osm_buildings: List[Dict]) -> Tuple[int, float]:
+    def find_nearest(self, query_xy: np.ndarray, target_xy: np.ndarray,
+                     max_distance: float = np.inf) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Find the closest OSM building to a model detection
+        Find the nearest target point within `max_distance` of every query point
+        
+        Targets outside the bounding box of the query points (grown by
+        `max_distance`) are dropped first. Small inputs are then searched with
+        a full distance matrix, larger ones with a KD-tree that skips branches
+        farther away than `max_distance`.
         
         Args:
-            detection_point: (lat, lon) of model detection
-            osm_buildings: List of OSM building dictionaries
+            query_xy: (N, 2) array of projected points to match
+            target_xy: (M, 2) array of projected candidate points
+            max_distance: Search radius in meters
             
         Returns:
-            Tuple of (osm_id, distance) or (None, float('inf')) if none found
+            Tuple of (index into target_xy, distance in meters) arrays;
+            index -1 and distance inf when no target is within range
         """
-        min_distance = float('inf')
-        closest_osm_id = None
-        
-        for building in osm_buildings:
-            if 'centroid' in building:
-                osm_centroid = (building['centroid']['lat'], building['centroid']['lon'])
-                distance = self.haversine_distance(detection_point, osm_centroid)
-                
-                if distance < min_distance:
-                    min_distance = distance
-                    closest_osm_id = building['id']
-        
-        return closest_osm_id, min_distance
+        # Box quick-reject: these targets can never be within range of any query point
+        candidates = None
+        if np.isfinite(max_distance) and len(query_xy) and len(target_xy):
+            low = query_xy.min(axis=0) - max_distance
+            high = query_xy.max(axis=0) + max_distance
+            in_box = ((target_xy >= low) & (target_xy <= high)).all(axis=1)
+            if not in_box.all():
+                candidates = np.flatnonzero(in_box)
+                target_xy = target_xy[candidates]
+        
+        if len(target_xy) == 0:
+            return np.full(len(query_xy), -1), np.full(len(query_xy), np.inf)
+        
+        if len(query_xy) * len(target_xy) <= MATRIX_MAX_PAIRS:
+            # Rank on squared distance; sqrt only for the nearest pair of each query point
+            squared = ((query_xy[:, None, :] - target_xy[None, :, :]) ** 2).sum(axis=2)
+            nearest = squared.argmin(axis=1)
+            distance = np.sqrt(squared[np.arange(len(query_xy)), nearest])
+            out_of_range = distance > max_distance
+        else:
+            tree = cKDTree(target_xy)
+            # Queries are independent, so spread them over all CPU cores. The tree
+            # only returns neighbours strictly inside the bound; nudge it so points
+            # exactly at max_distance still count
+            distance, nearest = tree.query(query_xy, k=1, workers=-1,
+                                           distance_upper_bound=np.nextafter(max_distance, np.inf))
+            out_of_range = np.isinf(distance)
+        
+        if candidates is not None:
+            # Map back to indices into the full target array
+            nearest[~out_of_range] = candidates[nearest[~out_of_range]]
+        nearest[out_of_range] = -1
+        distance[out_of_range] = np.inf
+        return nearest, distance
     
     def perform_spatial_matching(self, model_detections: List[Dict], 
-                               osm_buildings: List[Dict]) -> Tuple[List[BuildingMatch], List[DetectionMatch]]:
+                               osm_buildings: List[Dict]) -> Tuple[MatchResult, MatchResult]:
         """
         Perform spatial matching between model detections and OSM buildings
         
@@ -192,47 +277,51 @@ class SpatialMatcher:
         Returns:
             Tuple of (building_matches, detection_matches)
         """
-        building_matches = []
-        detection_matches = []
-        
-        # Match OSM buildings to detections
-        for i, building in enumerate(osm_buildings):
-            if 'centroid' not in building:
-                continue
-                
-            osm_centroid = (building['centroid']['lat'], building['centroid']['lon'])
-            closest_detection_id, distance = self.find_closest_detection(osm_centroid, model_detections)
-            
-            building_match = BuildingMatch(
-                osm_id=building['id'],
-                osm_centroid=osm_centroid
-            )
-            
-            if distance <= self.distance_threshold:
-                building_match.matched_detection_id = closest_detection_id
-                building_match.distance_to_match = distance
-                building_match.is_matched = True
-            
-            building_matches.append(building_match)
-        
-        # Match detections to OSM buildings
-        for detection in model_detections:
-            detection_point = (detection['lat'], detection['lon'])
-            closest_osm_id, distance = self.find_closest_osm_building(detection_point, osm_buildings)
-            
-            detection_match = DetectionMatch(
-                detection_id=detection['id'],
-                detection_point=detection_point
-            )
-            
-            if distance <= self.distance_threshold:
-                detection_match.matched_osm_id = closest_osm_id
-                detection_match.distance_to_match = distance
-                detection_match.is_matched = True
-            
-            detection_matches.append(detection_match)
-        
+        # Only buildings with a centroid can be matched; filter them once, in the
+        # same pass that reads their coordinates
+        osm_with_centroid = []
+        osm_coords = []
+        for building in osm_buildings:
+            centroid = building.get('centroid')
+            if centroid is not None:
+                osm_with_centroid.append(building)
+                osm_coords.append((centroid['lat'], centroid['lon']))
+        osm_points = np.array(osm_coords, dtype=np.float64).reshape(-1, 2)
+        detection_points = np.array([(d['lat'], d['lon']) for d in model_detections],
+                                    dtype=np.float64).reshape(-1, 2)
+        osm_ids = _object_array([building['id'] for building in osm_with_centroid])
+        osm_geometries = _object_array([building.get('geometry') for building in osm_with_centroid])
+        detection_ids = _object_array([detection['id'] for detection in model_detections])
+        
+        # Project both sets around the mean latitude of the study area
+        all_lats = np.concatenate((osm_points[:, 0], detection_points[:, 0]))
+        ref_lat = float(all_lats.mean()) if len(all_lats) else 0.0
+        osm_xy = self._project_local(osm_points, ref_lat)
+        detection_xy = self._project_local(detection_points, ref_lat)
+        
+        # Nearest neighbour in each direction
+        osm_nearest, osm_distance = self.find_nearest(osm_xy, detection_xy, self.distance_threshold)
+        detection_nearest, detection_distance = self.find_nearest(detection_xy, osm_xy, self.distance_threshold)
+        
+        building_matches = self._match_result(osm_ids, osm_points, osm_nearest, osm_distance, detection_ids)
+        building_matches.geometries = osm_geometries
+        detection_matches = self._match_result(detection_ids, detection_points, detection_nearest,
+                                               detection_distance, osm_ids)
         return building_matches, detection_matches
+    
+    def _match_result(self, ids: np.ndarray, points: np.ndarray, nearest: np.ndarray,
+                      distance: np.ndarray, other_ids: np.ndarray) -> MatchResult:
+        """Build the match columns for one point set from its nearest-neighbour search"""
+        is_matched = distance <= self.distance_threshold
+        matched_ids = np.full(len(ids), None, dtype=object)
+        matched_ids[is_matched] = other_ids[nearest[is_matched]]
+        return MatchResult(
+            ids=ids,
+            points=points,
+            is_matched=is_matched,
+            matched_ids=matched_ids,
+            distance_to_match=np.where(is_matched, distance, np.nan)
+        )
 
 class EnhancedEvaluationVisualizer:
     """Creates enhanced visualizations with spatial matching results"""
@@ -241,13 +330,13 @@ class EnhancedEvaluationVisualizer:
         self.matcher = SpatialMatcher(distance_threshold)
         self.distance_threshold = distance_threshold
     
-    def calculate_metrics(self, building_matches: List[BuildingMatch], 
-                         detection_matches: List[DetectionMatch]) -> Dict[str, float]:
+    def calculate_metrics(self, building_matches: MatchResult, 
+                         detection_matches: MatchResult) -> Dict[str, float]:
         """Calculate precision, recall, and F1-score"""
         
-        true_positives = len([bm for bm in building_matches if bm.is_matched])
-        false_negatives = len([bm for bm in building_matches if not bm.is_matched])
-        false_positives = len([dm for dm in detection_matches if not dm.is_matched])
+        true_positives = int(building_matches.is_matched.sum())
+        false_negatives = len(building_matches) - true_positives
+        false_positives = len(detection_matches) - int(detection_matches.is_matched.sum())
         
         precision = true_positives / (true_positives + false_positives) if (true_positives + false_positives) > 0 else 0
         recall = true_positives / (true_positives + false_negatives) if (true_positives + false_negatives) > 0 else 0
@@ -278,8 +367,7 @@ class EnhancedEvaluationVisualizer:
         
         # Calculate map center
         if study_area_coords:
-            center_lat = sum(coord[1] for coord in study_area_coords) / len(study_area_coords)
-            center_lon = sum(coord[0] for coord in study_area_coords) / len(study_area_coords)
+            center_lon, center_lat = np.asarray(study_area_coords, dtype=np.float64)[:, :2].mean(axis=0).tolist()
         else:
             center_lat, center_lon = -7.8, 110.4
         
@@ -300,88 +388,108 @@ class EnhancedEvaluationVisualizer:
                 popup='Study Area Boundary'
             ).add_to(m)
         
-        # Create building index for quick lookup
-        osm_building_lookup = {building['id']: building for building in osm_buildings}
+        m.get_root().header.add_child(folium.Element(BUILDING_LABEL_CSS))
         
-        # Add OSM buildings with improved color coding
-        for i, building_match in enumerate(building_matches):
-            building = osm_building_lookup.get(building_match.osm_id)
-            if not building or 'geometry' not in building:
+        # Collect buildings as GeoJSON features; each group becomes one Leaflet layer
+        building_features = []
+        centroid_features = {'matched': [], 'missed': []}
+        for i, (geometry, centroid, is_matched, matched_id, distance) in enumerate(zip(
+                building_matches.geometries.tolist(), building_matches.points.tolist(),
+                building_matches.is_matched.tolist(), building_matches.matched_ids.tolist(),
+                building_matches.distance_to_match.tolist())):
+            if geometry is None:
                 continue
             
             # Determine color based on matching status
-            if building_match.is_matched:
+            if is_matched:
                 fill_color = '#28a745'  # Green for successfully detected
-                border_color = 'white'
-                status = 'Successfully Detected'
-                popup_text = f"🏠 OSM Building #{i+1}<br>📊 Status: <b>{status}</b><br>🎯 Matched to Detection ID: {building_match.matched_detection_id}<br>📏 Distance: {building_match.distance_to_match:.1f}m"
+                label_class = 'matched'
+                popup_text = MATCHED_BUILDING_POPUP.format(number=i + 1, matched_id=matched_id, distance=distance)
             else:
                 fill_color = '#dc3545'  # Red for missed buildings
-                border_color = 'white'
-                status = 'MISSED by Model'
-                popup_text = f"🏠 OSM Building #{i+1}<br>⚠️ Status: <b>{status}</b><br>❌ No nearby detection found"
-            
-            # Add building polygon with improved styling
-            if building['geometry']['type'] == 'Polygon':
-                coords = building['geometry']['coordinates'][0]
-                folium.Polygon(
-                    locations=[[coord[1], coord[0]] for coord in coords],
-                    color=border_color,
-                    weight=3,
-                    fill=True,
-                    fillColor=fill_color,
-                    fillOpacity=0.6,
-                    popup=popup_text
-                ).add_to(m)
+                label_class = 'missed'
+                popup_text = MISSED_BUILDING_POPUP.format(number=i + 1)
             
-            # Add centroid marker with improved styling
-            centroid = building_match.osm_centroid
-            folium.CircleMarker(
-                location=[centroid[0], centroid[1]],
-                radius=4,
-                color=border_color,
-                weight=2,
-                fill=True,
-                fillColor=fill_color,
-                fillOpacity=0.8,
-                popup=popup_text
+            properties = {'fill_color': fill_color, 'popup': popup_text, 'label': i + 1}
+            if geometry['type'] == 'Polygon':
+                building_features.append({
+                    'type': 'Feature',
+                    'geometry': geometry,
+                    'properties': properties
+                })
+            centroid_features[label_class].append({
+                'type': 'Feature',
+                'geometry': {'type': 'Point', 'coordinates': [centroid[1], centroid[0]]},
+                'properties': properties
+            })
+        
+        # Building polygons (folium's popups/tooltips fail to render on an empty
+        # FeatureCollection, so empty groups get no layer)
+        if building_features:
+            folium.GeoJson(
+                {'type': 'FeatureCollection', 'features': building_features},
+                style_function=lambda feature: {
+                    'color': 'white',
+                    'weight': 3,
+                    'fillColor': feature['properties']['fill_color'],
+                    'fillOpacity': 0.6
+                },
+                popup=folium.GeoJsonPopup(fields=['popup'], labels=False)
             ).add_to(m)
-            
-            # Add building number label with improved styling
-            folium.Marker(
-                location=[centroid[0], centroid[1]],
-                icon=folium.DivIcon(
-                    html=f'<div style="font-size: 10px; font-weight: bold; color: white; background-color: {fill_color}; border-radius: 50%; padding: 2px; text-align: center; width: 16px; height: 16px;">{i+1}</div>',
-                    icon_size=(16, 16),
-                    icon_anchor=(8, 8)
+        
+        # Building centroids, with the building number as a permanent label
+        for label_class, features in centroid_features.items():
+            if not features:
+                continue
+            folium.GeoJson(
+                {'type': 'FeatureCollection', 'features': features},
+                marker=folium.CircleMarker(radius=4),
+                style_function=lambda feature: {
+                    'color': 'white',
+                    'weight': 2,
+                    'fill': True,
+                    'fillColor': feature['properties']['fill_color'],
+                    'fillOpacity': 0.8
+                },
+                popup=folium.GeoJsonPopup(fields=['popup'], labels=False),
+                tooltip=folium.GeoJsonTooltip(
+                    fields=['label'], labels=False, sticky=False, permanent=True,
+                    direction='center', class_name=f'building-label {label_class}'
                 )
             ).add_to(m)
         
         # Add model detections with consistent blue color
-        for detection_match in detection_matches:
-            detection_point = detection_match.detection_point
-            
-            # All model detections use blue color
-            detection_color = '#0066CC'  # Blue for all model detections
+        detection_features = []
+        for detection_id, detection_point, is_matched, matched_id, distance in zip(
+                detection_matches.ids.tolist(), detection_matches.points.tolist(),
+                detection_matches.is_matched.tolist(), detection_matches.matched_ids.tolist(),
+                detection_matches.distance_to_match.tolist()):
             
             # Determine status text based on matching
-            if detection_match.is_matched:
-                status = 'True Positive'
-                popup_text = f"🎯 Model Detection ID: {detection_match.detection_id}<br>📊 Status: <b>{status}</b><br>🏠 Matched to OSM Building ID: {detection_match.matched_osm_id}<br>📏 Distance: {detection_match.distance_to_match:.1f}m"
+            if is_matched:
+                popup_text = MATCHED_DETECTION_POPUP.format(detection_id=detection_id, matched_id=matched_id, distance=distance)
             else:
-                status = 'False Positive'
-                popup_text = f"🎯 Model Detection ID: {detection_match.detection_id}<br>⚠️ Status: <b>{status}</b><br>❌ No nearby OSM building found"
+                popup_text = UNMATCHED_DETECTION_POPUP.format(detection_id=detection_id)
             
-            # Add detection marker with consistent blue styling
-            folium.CircleMarker(
-                location=[detection_point[0], detection_point[1]],
-                radius=6,
-                color='white',
-                weight=2,
-                fill=True,
-                fillColor=detection_color,
-                fillOpacity=0.8,
-                popup=popup_text
+            detection_features.append({
+                'type': 'Feature',
+                'geometry': {'type': 'Point', 'coordinates': [detection_point[1], detection_point[0]]},
+                'properties': {'popup': popup_text}
+            })
+        
+        # All model detections use blue color
+        if detection_features:
+            folium.GeoJson(
+                {'type': 'FeatureCollection', 'features': detection_features},
+                marker=folium.CircleMarker(radius=6),
+                style_function=lambda feature: {
+                    'color': 'white',
+                    'weight': 2,
+                    'fill': True,
+                    'fillColor': '#0066CC',
+                    'fillOpacity': 0.8
+                },
+                popup=folium.GeoJsonPopup(fields=['popup'], labels=False)
             ).add_to(m)
         
         # Add enhanced legend with improved color scheme
@@ -422,30 +530,35 @@ class EnhancedEvaluationVisualizer:
         
         return {
             'metrics': metrics,
-            'building_matches': [
-                {
-                    'osm_id': bm.osm_id,
-                    'osm_centroid': bm.osm_centroid,
-                    'is_matched': bm.is_matched,
-                    'matched_detection_id': bm.matched_detection_id,
-                    'distance_to_match': bm.distance_to_match
-                }
-                for bm in building_matches
-            ],
-            'detection_matches': [
-                {
-                    'detection_id': dm.detection_id,
-                    'detection_point': dm.detection_point,
-                    'is_matched': dm.is_matched,
-                    'matched_osm_id': dm.matched_osm_id,
-                    'distance_to_match': dm.distance_to_match
-                }
-                for dm in detection_matches
-            ]
+            'building_matches': building_matches.to_columns('osm_id', 'osm_centroid', 'matched_detection_id'),
+            'detection_matches': detection_matches.to_columns('detection_id', 'detection_point', 'matched_osm_id')
         }
 
+def save_detailed_results(results: Dict, output_file: Path, compress: bool = False) -> Path:
+    """
+    Write the detailed results JSON
+    
+    With compress=True the output is compact JSON in a gzip file next to
+    output_file (.json.gz); level 1 keeps the write fast.
+    """
+    if compress:
+        output_file = output_file.with_suffix('.json.gz')
+        with gzip.open(output_file, 'wb', compresslevel=1) as f:
+            f.write(orjson.dumps(results, option=orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    return output_file
+
 def main():
     """Main execution function"""
+    parser = argparse.ArgumentParser(description="Create enhanced building detection evaluation map")
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="Write detailed_evaluation_results.json.gz instead of plain JSON"
+    )
+    args = parser.parse_args()
     
     print("🔍 Enhanced Building Detection Evaluation")
     print("=" * 50)
@@ -464,8 +577,8 @@ def main():
     print("📂 Loading data files...")
     
     try:
-        with open(model_detections_file, 'r') as f:
-            model_detections_raw = json.load(f)
+        with open(model_detections_file, 'rb') as f:
+            model_detections_raw = orjson.loads(f.read())
             # Handle different data structures
             if isinstance(model_detections_raw, list):
                 model_detections = model_detections_raw
@@ -486,8 +599,8 @@ def main():
         
         print(f"✅ Loaded {len(model_detections)} model detections")
         
-        with open(osm_buildings_file, 'r') as f:
-            osm_data = json.load(f)
+        with open(osm_buildings_file, 'rb') as f:
+            osm_data = orjson.loads(f.read())
             if 'buildings' in osm_data:
                 osm_buildings = osm_data['buildings']
             elif 'features' in osm_data:
@@ -500,9 +613,8 @@ def main():
                     }
                     # Calculate centroid if not present
                     if 'centroid' not in building and feature['geometry']['type'] == 'Polygon':
-                        coords = feature['geometry']['coordinates'][0]
-                        avg_lat = sum(coord[1] for coord in coords) / len(coords)
-                        avg_lon = sum(coord[0] for coord in coords) / len(coords)
+                        coords = np.asarray(feature['geometry']['coordinates'][0], dtype=np.float64)
+                        avg_lon, avg_lat = coords[:, :2].mean(axis=0).tolist()
                         building['centroid'] = {'lat': avg_lat, 'lon': avg_lon}
                     osm_buildings.append(building)
             else:
@@ -510,8 +622,8 @@ def main():
                 
         print(f"✅ Loaded {len(osm_buildings)} OSM buildings (filtered)")
         
-        with open(study_area_file, 'r') as f:
-            study_area = json.load(f)
+        with open(study_area_file, 'rb') as f:
+            study_area = orjson.loads(f.read())
             study_area_coords = study_area['features'][0]['geometry']['coordinates'][0]
         print(f"✅ Loaded study area with {len(study_area_coords)} coordinates")
         
@@ -536,9 +648,8 @@ def main():
         print(f"✅ Enhanced map saved to: {enhanced_map_file}")
         
         # Save detailed results
-        with open(detailed_results_file, 'w') as f:
-            json.dump(results, f, indent=2)
-        print(f"✅ Detailed results saved to: {detailed_results_file}")
+        saved_results_file = save_detailed_results(results, detailed_results_file, args.gzip)
+        print(f"✅ Detailed results saved to: {saved_results_file}")
         
         # Print summary statistics
         metrics = results['metrics']
@@ -561,15 +672,18 @@ def main():
         detailed_summary = analyzer.generate_simple_summary(metrics)
         print(detailed_summary)
         
-        # Highlight missed buildings
-        missed_buildings = [bm for bm in results['building_matches'] if not bm['is_matched']]
-        if missed_buildings:
-            print(f"\n⚠️  MISSED BUILDINGS (FN): {len(missed_buildings)} buildings")
+        # Highlight missed buildings (the count is already in the metrics)
+        missed_count = metrics['false_negatives']
+        if missed_count:
+            print(f"\n⚠️  MISSED BUILDINGS (FN): {missed_count} buildings")
             print("Missed OSM Building IDs:")
-            for i, missed in enumerate(missed_buildings[:10]):  # Show first 10
-                print(f"  - OSM ID: {missed['osm_id']}")
-            if len(missed_buildings) > 10:
-                print(f"  ... and {len(missed_buildings) - 10} more")
+            building_columns = results['building_matches']
+            missed_ids = (osm_id for osm_id, is_matched in zip(building_columns['osm_id'], building_columns['is_matched'])
+                          if not is_matched)
+            for osm_id in islice(missed_ids, 10):  # Show first 10
+                print(f"  - OSM ID: {osm_id}")
+            if missed_count > 10:
+                print(f"  ... and {missed_count - 10} more")
         
         print("\n🌐 Open the enhanced map to see color-coded results:")
         print(f"   file://{enhanced_map_file}")
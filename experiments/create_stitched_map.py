@@ -15,20 +15,36 @@ Example:
 import sys
 import argparse
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 import matplotlib.pyplot as plt
 import numpy as np
-from matplotlib.path import Path as MplPath
+import shapely
+from PIL import Image, ImageChops
 
 # Add src to path for imports (adjusted for experiments/ location)
 project_root = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(project_root / "src"))
 
 from src.utils.geojson_utils import load_geojson, extract_polygon
-from src.core.tile_utils import get_tiles_for_polygon, get_tile_image, create_stitched_image, get_tile_bounds
+from src.core.tile_utils import get_tiles_for_polygon, get_tile_image, get_tile_bounds
 
+# Downloaded tiles are kept here as {zoom}/{x}_{y}.png and reused across runs
+TILE_CACHE_DIR = Path.home() / ".cache" / "stitched_map"
 
-def create_stitched_visualization(geojson_path, output_path, zoom=18):
+# The polygon mask is tested on one pixel per MASK_DOWNSAMPLE x MASK_DOWNSAMPLE block;
+# the few-pixel staircase along the boundary is invisible in the saved figure
+MASK_DOWNSAMPLE = 4
+
+# Automatic output DPI: enough to show the polygon's tile pixels at native size,
+# within these limits, so the saved map never exceeds MAX_OUTPUT_PX on its long side
+FIGURE_SIZE_IN = 15
+MAX_OUTPUT_PX = 4096
+MIN_AUTO_DPI = 72
+MAX_DPI = 300
+
+
+def create_stitched_visualization(geojson_path, output_path, zoom=18, workers=8, cache_dir=TILE_CACHE_DIR, dpi=None):
     """
     Create a stitched satellite map with only polygon outline.
     
@@ -36,6 +52,9 @@ def create_stitched_visualization(geojson_path, output_path, zoom=18):
         geojson_path: Path to the GeoJSON file containing the study area
         output_path: Path to save the stitched map image
         zoom: Zoom level for satellite tiles (default: 18)
+        workers: Number of concurrent tile downloads (default: 8)
+        cache_dir: Directory for cached tiles, or None to always download
+        dpi: Output DPI, or None to pick it from the polygon's pixel size
     """
     print(f"Loading GeoJSON from {geojson_path}...")
     
@@ -51,59 +70,138 @@ def create_stitched_visualization(geojson_path, output_path, zoom=18):
     
     print(f"Found {len(tiles_data)} tiles to download")
     
-    # Download tile images and create raw tile data structure
-    raw_tile_data = []
-    for i, tile in enumerate(tiles_data):
-        print(f"Processing tile {i+1}/{len(tiles_data)}: {tile.x},{tile.y}")
-        
-        # Download tile image
-        image = get_tile_image(tile)
-        
-        # Get tile bounds
-        bounds = get_tile_bounds(tile)
-        
-        # Create tile data structure compatible with existing stitching code
-        tile_data = {
-            'tile_x': tile.x,
-            'tile_y': tile.y,
-            'zoom': zoom,
-            'bounds': bounds,
-            'image': image
-        }
-        raw_tile_data.append(tile_data)
-    
-    # Create stitched image
-    print("Creating stitched image...")
-    if not any(d.get('image') for d in raw_tile_data):
+    if not tiles_data:
         print("Warning: No tile images available. Creating bounds-only visualization.")
-        create_bounds_only_visualization(polygon_area, output_path)
+        create_bounds_only_visualization(polygon_area, output_path, dpi or MAX_DPI)
         return
     
+    # Lay out the stitched canvas from the tile bounds before downloading
+    print("Creating stitched image...")
+    stitched_image, transform_params, tile_positions = create_stitching_canvas(
+        [get_tile_bounds(tile) for tile in tiles_data]
+    )
+    
+    # Download tile images concurrently (each fetch waits on the tile server) and
+    # paste each one as soon as it arrives, so decoded tiles are not all held at once
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {
+            executor.submit(fetch_tile_image, tile, cache_dir): i
+            for i, tile in enumerate(tiles_data)
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            i = futures.pop(future)
+            stitched_image.paste(future.result(), tile_positions[i])
+            print(f"Processed tile {done}/{len(tiles_data)}: {tiles_data[i].x},{tiles_data[i].y}")
+    
     try:
-        stitched_image, transform_params = create_stitched_image(raw_tile_data)
-        
         # Create visualization
         create_final_visualization(
             stitched_image, 
             transform_params, 
             polygon_area, 
             geojson_data, 
-            output_path
+            output_path,
+            dpi
         )
         
     except Exception as e:
         print(f"Error creating stitched image: {e}")
         print("Falling back to bounds-only visualization.")
-        create_bounds_only_visualization(polygon_area, output_path)
+        create_bounds_only_visualization(polygon_area, output_path, dpi or MAX_DPI)
+
+
+def create_stitching_canvas(tile_bounds, tile_size=256):
+    """
+    Allocate the stitched image and place every tile on it, before any download.
+    
+    Uses the same layout as create_stitched_image.
+    
+    Args:
+        tile_bounds: List of [west, south, east, north] bounds, one per tile
+        tile_size: Tile edge length in pixels (default: 256)
+        
+    Returns:
+        Tuple of (stitched_image, transform_params, tile_positions)
+        - stitched_image: Blank PIL Image covering all tiles
+        - transform_params: Parameters for transforming geo coordinates to pixel coordinates
+        - tile_positions: (x, y) paste position of each tile, in tile_bounds order
+    """
+    bounds = np.asarray(tile_bounds, dtype=np.float64)
+    min_west, min_south = bounds[:, :2].min(axis=0).tolist()
+    max_east, max_north = bounds[:, 2:].max(axis=0).tolist()
+    width_deg = max_east - min_west
+    height_deg = max_north - min_south
+    
+    # One tile per distinct column/row edge
+    width_px = len(np.unique(bounds[:, 0])) * tile_size
+    height_px = len(np.unique(bounds[:, 3])) * tile_size
+    
+    tile_positions = [
+        (int((west - min_west) / width_deg * width_px), int((max_north - north) / height_deg * height_px))
+        for west, _, _, north in tile_bounds
+    ]
+    
+    stitched_image = Image.new('RGB', (width_px, height_px), (255, 255, 255))
+    transform_params = {
+        'min_west': min_west,
+        'max_north': max_north,
+        'width_deg': width_deg,
+        'height_deg': height_deg,
+        'width_px': width_px,
+        'height_px': height_px
+    }
+    return stitched_image, transform_params, tile_positions
+
+
+def cached_tile_image(tile, cache_dir):
+    """
+    Get a tile image from the disk cache, downloading and caching it on a miss.
+    
+    Args:
+        tile: A mercantile Tile object
+        cache_dir: Cache root directory
+        
+    Returns:
+        PIL Image object of the tile
+    """
+    cache_path = Path(cache_dir) / str(tile.z) / f"{tile.x}_{tile.y}.png"
+    if cache_path.exists():
+        with Image.open(cache_path) as cached:
+            cached.load()
+            return cached.convert('RGB')
+    
+    image = get_tile_image(tile)
+    
+    # Write under a temporary name first so concurrent runs never read a partial file
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = cache_path.with_name(f"{cache_path.stem}.{os.getpid()}.tmp")
+    image.save(temp_path, "PNG", optimize=False)
+    os.replace(temp_path, cache_path)
+    return image
+
+
+def fetch_tile_image(tile, cache_dir=None):
+    """
+    Download (or load from cache) one tile image.
+    
+    Args:
+        tile: A mercantile Tile object
+        cache_dir: Tile cache directory, or None to always download
+        
+    Returns:
+        PIL Image object of the tile
+    """
+    return cached_tile_image(tile, cache_dir) if cache_dir else get_tile_image(tile)
 
 
-def create_polygon_mask(polygon_area, transform_params):
+def create_polygon_mask(polygon_area, transform_params, downsample=MASK_DOWNSAMPLE):
     """
     Create a mask for the polygon area on the stitched image.
     
     Args:
         polygon_area: Shapely polygon in geographic coordinates
         transform_params: Transform parameters from stitched image
+        downsample: Block size in pixels sharing one point-in-polygon test (1 = every pixel)
         
     Returns:
         Boolean mask array where True = inside polygon, False = outside
@@ -136,19 +234,38 @@ def create_polygon_mask(polygon_area, transform_params):
     polygon_bounds = polygon_area.bounds
     print(f"DEBUG: Polygon bounds: {polygon_bounds}")
     
-    # Create meshgrid
-    X, Y = np.meshgrid(x_coords, y_coords)
-    
-    # Convert polygon to path
-    polygon_coords = list(polygon_area.exterior.coords)
-    print(f"DEBUG: First few polygon coords: {polygon_coords[:3]}")
-    
-    polygon_path = MplPath(polygon_coords)
+    # Test the centre pixel of each downsample x downsample block
+    downsample = max(1, int(downsample))
+    x_samples = np.minimum(np.arange(0, width_pixels, downsample) + downsample // 2, width_pixels - 1)
+    y_samples = np.minimum(np.arange(0, height_pixels, downsample) + downsample // 2, height_pixels - 1)
+    
+    x_sample_coords = x_coords[x_samples]
+    y_sample_coords = y_coords[y_samples]
+    
+    # Only samples inside the polygon's bounding box can be inside the polygon
+    min_x, min_y, max_x, max_y = polygon_bounds
+    x_in_bounds = np.flatnonzero((x_sample_coords >= min_x) & (x_sample_coords <= max_x))
+    y_in_bounds = np.flatnonzero((y_sample_coords >= min_y) & (y_sample_coords <= max_y))
+    
+    # Create mask with GEOS' prepared point-in-polygon test (holes and
+    # multipolygons are handled too). A row of x and a column of y broadcast
+    # to the bounding-box window, so no meshgrid is materialized.
+    mask = np.zeros((len(y_samples), len(x_samples)), dtype=bool)
+    if len(x_in_bounds) and len(y_in_bounds):
+        col_start, col_end = x_in_bounds[0], x_in_bounds[-1] + 1
+        row_start, row_end = y_in_bounds[0], y_in_bounds[-1] + 1
+        shapely.prepare(polygon_area)
+        mask[row_start:row_end, col_start:col_end] = shapely.contains_xy(
+            polygon_area,
+            x_sample_coords[np.newaxis, col_start:col_end],
+            y_sample_coords[row_start:row_end, np.newaxis]
+        )
     
-    # Create mask
-    points = np.column_stack((X.ravel(), Y.ravel()))
-    mask = polygon_path.contains_points(points)
-    mask = mask.reshape(height_pixels, width_pixels)
+    # Nearest-neighbour upsample back to full resolution
+    if downsample > 1:
+        rows = np.arange(height_pixels) // downsample
+        cols = np.arange(width_pixels) // downsample
+        mask = mask[rows[:, np.newaxis], cols[np.newaxis, :]]
     
     # Debug mask statistics
     mask_count = np.sum(mask)
@@ -170,6 +287,8 @@ def apply_polygon_mask(stitched_image, mask):
     """
     Apply polygon mask to stitched image.
     
+    The mask is written as the image's alpha channel in place.
+    
     Args:
         stitched_image: PIL Image
         mask: Boolean mask array
@@ -177,24 +296,38 @@ def apply_polygon_mask(stitched_image, mask):
     Returns:
         Masked image as numpy array with transparent areas outside polygon
     """
-    # Convert PIL Image to numpy array
-    image_array = np.array(stitched_image)
-    
-    # Convert to RGBA if RGB
-    if image_array.shape[2] == 3:
-        rgba_image = np.zeros((*image_array.shape[:2], 4), dtype=image_array.dtype)
-        rgba_image[:, :, :3] = image_array
-        rgba_image[:, :, 3] = 255  # Full alpha
-    else:
-        rgba_image = image_array.copy()
+    # Alpha is 255 inside the polygon and 0 outside
+    alpha = Image.fromarray(np.multiply(mask, 255, dtype=np.uint8))
     
-    # Apply mask - set areas outside polygon to transparent
-    rgba_image[~mask, 3] = 0  # Set alpha to 0 for areas outside polygon
+    # Keep any existing transparency inside the polygon
+    if stitched_image.mode == 'RGBA':
+        alpha = ImageChops.multiply(stitched_image.getchannel('A'), alpha)
     
-    return rgba_image
+    stitched_image.putalpha(alpha)
+    return np.asarray(stitched_image)
 
 
-def create_final_visualization(stitched_image, transform_params, polygon_area, geojson_data, output_path):
+def pick_output_dpi(polygon_area, transform_params):
+    """
+    Pick an output DPI that shows the polygon area at about its native tile resolution.
+    
+    Args:
+        polygon_area: Shapely polygon in geographic coordinates
+        transform_params: Transform parameters from stitched image
+        
+    Returns:
+        DPI between MIN_AUTO_DPI and MAX_DPI, capped so the figure stays within MAX_OUTPUT_PX
+    """
+    minx, miny, maxx, maxy = polygon_area.bounds
+    polygon_width_px = (maxx - minx) / transform_params['width_deg'] * transform_params['width_px']
+    polygon_height_px = (maxy - miny) / transform_params['height_deg'] * transform_params['height_px']
+    
+    native_dpi = max(polygon_width_px, polygon_height_px) / FIGURE_SIZE_IN
+    max_dpi = min(MAX_DPI, MAX_OUTPUT_PX / FIGURE_SIZE_IN)
+    return int(min(max(native_dpi, MIN_AUTO_DPI), max_dpi))
+
+
+def create_final_visualization(stitched_image, transform_params, polygon_area, geojson_data, output_path, dpi=None):
     """Create the final visualization with stitched image and polygon overlay."""
     
     # Create polygon mask
@@ -205,7 +338,7 @@ def create_final_visualization(stitched_image, transform_params, polygon_area, g
     print("Applying polygon mask to image...")
     masked_image = apply_polygon_mask(stitched_image, mask)
     
-    fig, ax = plt.subplots(1, figsize=(15, 15))
+    fig, ax = plt.subplots(1, figsize=(FIGURE_SIZE_IN, FIGURE_SIZE_IN))
     
     # Display masked stitched image
     ax.imshow(masked_image, extent=[
@@ -241,15 +374,18 @@ def create_final_visualization(stitched_image, transform_params, polygon_area, g
     plt.tight_layout(pad=1.5)
     
     # Save the plot
-    plt.savefig(output_path, bbox_inches='tight', dpi=300, facecolor='white')
+    if dpi is None:
+        dpi = pick_output_dpi(polygon_area, transform_params)
+    print(f"Saving at {dpi} DPI...")
+    plt.savefig(output_path, bbox_inches='tight', dpi=dpi, facecolor='white', pil_kwargs={'optimize': True})
     print(f"Cropped stitched map saved to {output_path}")
     plt.close()
 
 
-def create_bounds_only_visualization(polygon_area, output_path):
+def create_bounds_only_visualization(polygon_area, output_path, dpi=MAX_DPI):
     """Create a simple visualization with just polygon bounds when no tiles are available."""
     
-    fig, ax = plt.subplots(1, figsize=(15, 15))
+    fig, ax = plt.subplots(1, figsize=(FIGURE_SIZE_IN, FIGURE_SIZE_IN))
     
     # Set bounds
     minx, miny, maxx, maxy = polygon_area.bounds
@@ -268,7 +404,7 @@ def create_bounds_only_visualization(polygon_area, output_path):
     ax.grid(True, alpha=0.3)
     
     plt.tight_layout()
-    plt.savefig(output_path, bbox_inches='tight', dpi=300)
+    plt.savefig(output_path, bbox_inches='tight', dpi=dpi)
     print(f"Bounds-only map saved to {output_path}")
     plt.close()
 
@@ -330,6 +466,32 @@ Examples:
         help="Zoom level for satellite tiles (default: 18)"
     )
     
+    parser.add_argument(
+        "--workers", "-w",
+        type=int,
+        default=8,
+        help="Number of concurrent tile downloads (default: 8)"
+    )
+    
+    parser.add_argument(
+        "--cache-dir",
+        default=str(TILE_CACHE_DIR),
+        help=f"Directory for cached tiles (default: {TILE_CACHE_DIR})"
+    )
+    
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always download tiles instead of using the tile cache"
+    )
+    
+    parser.add_argument(
+        "--dpi",
+        type=int,
+        default=None,
+        help=f"Output image DPI (default: auto from the polygon's pixel size, {MIN_AUTO_DPI}-{int(MAX_OUTPUT_PX / FIGURE_SIZE_IN)})"
+    )
+    
     args = parser.parse_args()
     
     # Validate inputs
@@ -349,10 +511,20 @@ Examples:
     print(f"Input GeoJSON: {args.geojson_path}")
     print(f"Output image: {args.output}")
     print(f"Zoom level: {args.zoom}")
+    print(f"Download workers: {args.workers}")
+    print(f"Tile cache: {'disabled' if args.no_cache else args.cache_dir}")
+    print(f"Output DPI: {args.dpi or 'auto'}")
     print("="*60 + "\n")
     
     try:
-        create_stitched_visualization(args.geojson_path, args.output, args.zoom)
+        create_stitched_visualization(
+            args.geojson_path,
+            args.output,
+            args.zoom,
+            args.workers,
+            cache_dir=None if args.no_cache else args.cache_dir,
+            dpi=args.dpi
+        )
         
         print("\n" + "="*60)
         print("STITCHED MAP CREATION COMPLETED")
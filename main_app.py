@@ -4,15 +4,16 @@ Building Detection API with modular architecture
 """
 
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import os
 import time
 import tempfile
 
 # Import existing detection system
-from src.core.detection import load_model
+from src.core.detection import load_model, load_tensorrt_model
 
 # Import logging system
 from api.utils.logging import get_logger, log_performance, setup_logging
@@ -21,6 +22,7 @@ from api.utils.logging import get_logger, log_performance, setup_logging
 from api.config import get_settings, validate_configuration, print_configuration
 from api.dependencies import initialize_dependencies, cleanup_dependencies
 from api.exceptions import register_exception_handlers
+from api.services import job_manager
 
 # Import routers
 from api.routers import health_router, detection_router, jobs_router, jobs_list_router
@@ -34,13 +36,12 @@ validate_configuration()
 
 # Global instances
 model = None
-executor = ThreadPoolExecutor(max_workers=settings.max_concurrent_jobs)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan handler (replaces deprecated on_event)"""
-    global model, executor
+    global model
     
     # Setup logging first
     logger = get_logger(__name__)
@@ -51,7 +52,10 @@ async def lifespan(app: FastAPI):
     try:
         if os.path.exists(settings.model_path):
             logger.info(f"Loading YOLOv8 model from {settings.model_path}")
-            model = load_model(settings.model_path)
+            if settings.use_tensorrt:
+                model = load_tensorrt_model(settings.model_path, settings.tensorrt_max_batch_size)
+            else:
+                model = load_model(settings.model_path)
             
             # Warm up model with dummy inference
             logger.info("Warming up model with test inference")
@@ -81,23 +85,19 @@ async def lifespan(app: FastAPI):
         model = None
     
     # Initialize dependencies
-    initialize_dependencies(model, executor, settings)
+    initialize_dependencies(model, settings)
     
-    # Configure routers with dependencies (legacy support)
-    from api.routers.health import set_model, set_max_concurrent_jobs as set_health_max_jobs
-    from api.routers.detection import set_dependencies  
-    from api.routers.jobs import set_max_concurrent_jobs
-    
-    set_model(model)
-    set_health_max_jobs(settings.max_concurrent_jobs)
-    set_dependencies(model, executor, settings.max_concurrent_jobs)
-    set_max_concurrent_jobs(settings.max_concurrent_jobs)
+    # Drop finished jobs periodically so the in-memory job table stays bounded
+    cleanup_task = asyncio.create_task(
+        job_manager.run_periodic_cleanup(settings.job_cleanup_interval_hours)
+    )
     
     print("🚀 Application startup completed")
     
     yield  # Application runs here
     
     # Shutdown
+    cleanup_task.cancel()
     cleanup_dependencies()
     print("🛑 Application shutdown completed")
 
@@ -109,6 +109,7 @@ app = FastAPI(
     version=settings.app_version,
     debug=settings.debug,
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     openapi_version="3.0.0",
     root_path="/ai"
 )
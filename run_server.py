@@ -11,6 +11,8 @@ Environment Variables:
     PORT: Server port (default: 5050)  
     MODEL_PATH: Path to model file (default: best.pt)
     MAX_CONCURRENT_JOBS: Max concurrent detection jobs (default: 2)
+    MAX_QUEUED_JOBS: Jobs allowed to wait for a free worker (default: 8)
+    TEMP_USE_SHM: Keep job workspaces on /dev/shm when available (default: True)
     DEBUG: Enable debug mode (default: False)
 """
 
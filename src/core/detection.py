@@ -28,6 +28,46 @@ def load_model(model_path="../models/best.pt"):
         print(f"Error loading model: {e}")
         raise
 
+def load_tensorrt_model(model_path="../models/best.pt", max_batch_size=16):
+    """
+    Load a TensorRT FP16 engine for a YOLOv8 model, exporting it on first use
+    
+    The engine is cached next to the model file (best.pt -> best.engine).
+    Engines are specific to a GPU generation, so the CUDA compute capability
+    used for the export is stored in a sidecar file and the engine is rebuilt
+    when it changes. Falls back to the PyTorch model when CUDA is unavailable.
+    
+    Args:
+        model_path: Path to the YOLOv8 model file (.pt)
+        max_batch_size: Largest number of tiles per inference call the engine accepts
+        
+    Returns:
+        Loaded YOLOv8 model backed by the TensorRT engine
+    """
+    import torch
+    
+    if not torch.cuda.is_available():
+        print("CUDA not available, using the PyTorch model instead of TensorRT")
+        return load_model(model_path)
+    
+    engine_path = os.path.splitext(model_path)[0] + ".engine"
+    capability_path = engine_path + ".capability"
+    capability = "{}.{}".format(*torch.cuda.get_device_capability())
+    
+    cached_capability = None
+    if os.path.exists(engine_path) and os.path.exists(capability_path):
+        with open(capability_path, 'r') as f:
+            cached_capability = f.read().strip()
+    
+    if cached_capability != capability:
+        print(f"Exporting TensorRT FP16 engine for compute capability {capability} (one-time)")
+        # Dynamic batch axis: tile batches vary in size (the last batch is usually smaller)
+        YOLO(model_path).export(format="engine", half=True, dynamic=True, batch=max_batch_size)
+        with open(capability_path, 'w') as f:
+            f.write(capability)
+    
+    return load_model(engine_path)
+
 def detect_buildings(model, image_path, conf=0.25):
     """
     Detect buildings in an image using the loaded YOLOv8 model
@@ -54,3 +94,18 @@ def detect_buildings(model, image_path, conf=0.25):
     
     return results[0], img_array
 
+def detect_buildings_batch(model, images, conf=0.25):
+    """
+    Detect buildings in several in-memory images with one batched model call
+    
+    Args:
+        model: Loaded YOLOv8 model
+        images: List of PIL images (RGB)
+        conf: Confidence threshold
+        
+    Returns:
+        List of model detection results, one per image
+    """
+    # Ultralytics stacks the images into a single input tensor and runs
+    # the forward pass under inference mode
+    return model.predict(images, conf=conf)
@@ -1,7 +1,6 @@
 import os
 import json
 import sys
-import tempfile
 import time
 from tqdm import tqdm
 import concurrent.futures
@@ -11,7 +10,7 @@ from shapely.ops import unary_union # Added for merging
 import threading # Added for thread lock
 import glob
 
-from .detection import load_model, detect_buildings
+from .detection import load_model, detect_buildings_batch
 from ..utils.geojson_utils import load_geojson, extract_polygon, create_example_geojson
 from .tile_utils import get_tile_bounds, get_tiles_for_polygon, get_tile_image, process_tile_detections
 from ..visualization.visualization import visualize_polygon_detections
@@ -813,45 +812,51 @@ def merge_overlapping_detections(individual_detections,
     return merged_buildings
 
 def process_tile_batch(tile_batch, model, conf, model_lock):
-    """Process a batch of tiles and return their detection results"""
+    """Process a batch of tiles and return their detection results
+    
+    All tiles of the batch are downloaded first and then passed to the model
+    together, in memory, as one batched inference call.
+    """
     batch_results = []
     
+    # Get tile images (in memory)
+    downloaded_tiles = []
     for tile in tile_batch:
         try:
-            # Get tile image (in memory)
-            tile_image = get_tile_image(tile)
-            
-            # Create a temporary file for detection
-            with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as temp_file:
-                temp_path = temp_file.name
-                # Save the image to the temporary file
-                tile_image.save(temp_path, format='PNG')
+            downloaded_tiles.append((tile, get_tile_image(tile)))
+        except Exception as e:
+            print(f"Error processing tile {tile}: {e}")
+    
+    if not downloaded_tiles:
+        return batch_results
+    
+    # Detect buildings in all tiles at once
+    # Ensure model access is serialized
+    try:
+        with model_lock:
+            results_per_tile = detect_buildings_batch(
+                model, [tile_image for _, tile_image in downloaded_tiles], conf=conf)
+    except Exception as e:
+        print(f"Error running detection on tile batch: {e}")
+        return batch_results
+    
+    for (tile, tile_image), results in zip(downloaded_tiles, results_per_tile):
+        try:
+            # Process detection results
+            boxes, confidences, class_ids = process_tile_detections(results)
             
-            try:
-                # Detect buildings using the temporary file path
-                # Ensure model access is serialized
-                with model_lock:
-                    results, _ = detect_buildings(model, temp_path, conf=conf)
-                
-                # Process detection results
-                boxes, confidences, class_ids = process_tile_detections(results)
-                
-                # Add to results
-                tile_bounds = get_tile_bounds(tile)
-                tile_detections = {
-                    'tile': f"{tile.z}/{tile.x}/{tile.y}",
-                    'bounds': tile_bounds,
-                    'detections': len(boxes),
-                    'boxes': boxes.tolist() if boxes.size > 0 else [],
-                    'confidences': confidences.tolist() if len(confidences) > 0 else [],
-                    'class_ids': class_ids.tolist() if len(class_ids) > 0 else [],
-                    'image': tile_image  # Store the image in memory
-                }
-                batch_results.append(tile_detections)
-            finally:
-                # Clean up the temporary file
-                if os.path.exists(temp_path):
-                    os.unlink(temp_path)
+            # Add to results
+            tile_bounds = get_tile_bounds(tile)
+            tile_detections = {
+                'tile': f"{tile.z}/{tile.x}/{tile.y}",
+                'bounds': tile_bounds,
+                'detections': len(boxes),
+                'boxes': boxes.tolist() if boxes.size > 0 else [],
+                'confidences': confidences.tolist() if len(confidences) > 0 else [],
+                'class_ids': class_ids.tolist() if len(class_ids) > 0 else [],
+                'image': tile_image  # Store the image in memory
+            }
+            batch_results.append(tile_detections)
             
         except Exception as e:
             print(f"Error processing tile {tile}: {e}")
@@ -868,10 +873,11 @@ def _initialize_detection_session(output_dir):
     os.makedirs(output_dir, exist_ok=True)
     return start_time
 
-def _load_and_prepare_data(geojson_path, zoom):
-    """Load GeoJSON data and prepare tiles for processing"""
-    geojson_data = load_geojson(geojson_path)
-    polygon = extract_polygon(geojson_data)
+def _load_and_prepare_data(geojson_path, zoom, polygon=None):
+    """Load GeoJSON data (unless an already parsed polygon is given) and prepare tiles for processing"""
+    if polygon is None:
+        geojson_data = load_geojson(geojson_path)
+        polygon = extract_polygon(geojson_data)
     tiles = get_tiles_for_polygon(polygon, zoom=zoom)
     print(f"Found {len(tiles)} tiles that intersect with the polygon")
     return tiles
@@ -899,8 +905,13 @@ def _handle_resume_logic(resume_from_saved, output_dir, tiles):
     
     return all_detections_raw_per_tile, tiles_to_process
 
-def _execute_tile_processing(tiles_to_process, batch_size, model, conf, output_dir, all_detections_raw_per_tile, progress_callback=None):
-    """Execute parallel tile processing and return updated detections"""
+def _execute_tile_processing(tiles_to_process, batch_size, model, conf, output_dir, all_detections_raw_per_tile, progress_callback=None,
+                             tile_done_callback=None):
+    """Execute parallel tile processing and return updated detections
+    
+    `tile_done_callback(box_count)` is called once per newly processed tile, so
+    callers can keep a running detection count instead of re-scanning all tiles.
+    """
     if not tiles_to_process:
         print("All tiles have been processed previously. Proceeding to merging...")
         return all_detections_raw_per_tile
@@ -935,6 +946,8 @@ def _execute_tile_processing(tiles_to_process, batch_size, model, conf, output_d
                     # Save each tile immediately after processing
                     for tile_detection in batch_detections:
                         save_tile_results(tile_detection, output_dir, tile_detection['tile'])
+                        if tile_done_callback:
+                            tile_done_callback(len(tile_detection['boxes']))
                     
                     all_detections_raw_per_tile.extend(batch_detections) # Store raw per-tile results
                 
@@ -1063,11 +1076,12 @@ def _generate_visualization(geojson_path, output_dir, total_buildings_final, til
         visualization_path
     )
 
-def _save_output_files(output_dir, json_results_payload, geojson_path):
+def _save_output_files(output_dir, json_results_payload, geojson_path, target_polygon=None):
     """Save only the simple buildings output file"""
     # Save buildings in simple format (only buildings inside polygon)
     buildings_simple_path = os.path.join(output_dir, "buildings_simple.json")
-    save_buildings_simple_format(json_results_payload, geojson_path, buildings_simple_path)
+    save_buildings_simple_format(json_results_payload, geojson_path, buildings_simple_path,
+                                 target_polygon=target_polygon)
 
     # Return the path to the main output we keep
     return buildings_simple_path
@@ -67,7 +67,7 @@ def save_buildings_to_json(results_data, output_path="buildings.json"):
     
     return output_path
 
-def save_buildings_simple_format(results_data, geojson_path, output_path="buildings_simple.json"):
+def save_buildings_simple_format(results_data, geojson_path, output_path="buildings_simple.json", target_polygon=None):
     """
     Save buildings in simple format with only buildings inside the GeoJSON polygon.
     Output format: [{id, longitude, latitude}, ...]
@@ -76,13 +76,15 @@ def save_buildings_simple_format(results_data, geojson_path, output_path="buildi
         results_data: Detection results payload
         geojson_path: Path to the GeoJSON file containing the target polygon
         output_path: Path to save the simple JSON file
+        target_polygon: Already parsed Shapely target polygon (skips loading geojson_path)
         
     Returns:
         Path to the saved JSON file
     """
-    # Load the GeoJSON polygon
-    geojson_data = load_geojson(geojson_path)
-    target_polygon = extract_polygon(geojson_data)
+    # Load the GeoJSON polygon unless the caller already has it
+    if target_polygon is None:
+        geojson_data = load_geojson(geojson_path)
+        target_polygon = extract_polygon(geojson_data)
     
     # Get building detections
     buildings_to_check = results_data.get('detections', [])
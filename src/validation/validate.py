@@ -1,9 +1,21 @@
 import folium
-import json
+from folium.plugins import FastMarkerCluster
+import orjson
+
+# Red building dot with its popup, built in the browser from one [lat, lon, id] row
+BUILDING_MARKER_CALLBACK = """
+var callback = function (row) {
+	var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {
+		radius: 3, color: 'red', fill: true, fillOpacity: 0.7
+	});
+	marker.bindPopup('ID: ' + row[2] + '<br>Lon: ' + row[1] + '<br>Lat: ' + row[0], {maxWidth: 300});
+	return marker;
+};
+"""
 
 # Load simple buildings list: [{"id": str, "longitude": float, "latitude": float}, ...]
-with open('output/buildings_simple.json', 'r') as f:
-	buildings = json.load(f)
+with open('output/buildings_simple.json', 'rb') as f:
+	buildings = orjson.loads(f.read())
 
 # Guard: ensure list format
 if not isinstance(buildings, list) or len(buildings) == 0:
@@ -16,20 +28,14 @@ avg_lon = sum(b["longitude"] for b in buildings) / len(buildings)
 
 m = folium.Map(location=[avg_lat, avg_lon], zoom_start=18, tiles='OpenStreetMap')
 
-# Plot points
-for b in buildings:
-	b_id = str(b.get("id", ""))
-	lon = float(b["longitude"])
-	lat = float(b["latitude"])
-	popup_html = f"ID: {b_id}<br>Lon: {lon}<br>Lat: {lat}"
-	folium.CircleMarker(
-		location=[lat, lon],
-		radius=3,
-		color='red',
-		fill=True,
-		fill_opacity=0.7,
-		popup=folium.Popup(popup_html, max_width=300)
-	).add_to(m)
+# Plot points: one data array rendered client-side instead of a layer per building;
+# points only cluster when zoomed out past the initial view
+points = [[float(b["latitude"]), float(b["longitude"]), str(b.get("id", ""))] for b in buildings]
+FastMarkerCluster(
+	points,
+	callback=BUILDING_MARKER_CALLBACK,
+	disable_clustering_at_zoom=18
+).add_to(m)
 
 # Save the map
 m.save('building_validation_map.html')